@@ -4,34 +4,38 @@ Add parameter visibility to Ableton drum rack (.adg) files
 Makes all 128 Komplete Kontrol parameters (101-228) visible in the device UI
 """
 
-import gzip
+import sys
 import argparse
 import re
 from pathlib import Path
 
-def extract_adg_to_xml(adg_path):
-    """Extract .adg file to XML string"""
-    with gzip.open(adg_path, 'rb') as f:
-        return f.read().decode('utf-8')
+# Add utils to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.adg_io import load_adg_bytes, save_adg
+from utils.plugin_parameters import build_param_section
 
-def compress_xml_to_adg(xml_content, adg_path):
-    """Compress XML string to .adg file"""
-    with gzip.open(adg_path, 'wb', compresslevel=6) as f:
-        f.write(xml_content.encode('utf-8'))
+# Patterns are bytes: every tag touched here is ASCII
+_PARAMETER_SETTINGS_RE = re.compile(rb'<ParameterSettings>(.*?)</ParameterSettings>', re.DOTALL)
 
-def add_parameter_visibility(xml_content, num_params=128, start_lom_id=76445):
+# Every caller uses the defaults, so that block is built once at import
+DEFAULT_NUM_PARAMS = 128
+DEFAULT_START_LOM_ID = 76445
+_DEFAULT_PARAM_SECTION = build_param_section(DEFAULT_NUM_PARAMS, DEFAULT_START_LOM_ID)
+
+def add_parameter_visibility(xml_content, num_params=DEFAULT_NUM_PARAMS, start_lom_id=DEFAULT_START_LOM_ID):
     """
     Add PluginParameterSettings to make parameters visible in Ableton
 
     Adds parameter settings for parameters 101-228 (128 params) if they don't exist.
     Does NOT map them to macros - just makes them visible.
+    xml_content is the UTF-8 XML as bytes.
     """
 
     # Check if ParameterSettings already exists with content
-    existing_param_match = re.search(r'<ParameterSettings>(.*?)</ParameterSettings>', xml_content, re.DOTALL)
+    existing_param_match = _PARAMETER_SETTINGS_RE.search(xml_content)
     if existing_param_match:
         existing_content = existing_param_match.group(1)
-        existing_count = existing_content.count('<PluginParameterSettings Id=')
+        existing_count = existing_content.count(b'<PluginParameterSettings Id=')
 
         if existing_count >= num_params:
             print(f"   ⚠️  Already has {existing_count} parameters (>= {num_params}), skipping...")
@@ -40,41 +44,18 @@ def add_parameter_visibility(xml_content, num_params=128, start_lom_id=76445):
             print(f"   📝 Extending from {existing_count} to {num_params} parameters...")
             # Continue to replace with full parameter set
 
-    # Generate the parameter settings
-    param_settings = []
-    for i in range(num_params):
-        param_id = 101 + i
-        lom_id = start_lom_id + i
-        index = i * 2
-
-        param_xml = f'''			<PluginParameterSettings Id="{i}">
-				<Index Value="{index}" />
-				<VisualIndex Value="{i}" />
-				<ParameterId Value="{param_id}" />
-				<Type Value="PluginFloatParameter" />
-				<MacroControlIndex Value="-1" />
-				<MidiControllerRange />
-				<LomId Value="{lom_id}" />
-			</PluginParameterSettings>'''
-        param_settings.append(param_xml)
-
-    # Join all parameter settings
-    full_param_settings = '\n'.join(param_settings)
-
     # Replace ParameterSettings (empty or existing) with the full version
-    new_param_section = f'<ParameterSettings>\n{full_param_settings}\n\t\t\t\t\t</ParameterSettings>'
+    if num_params == DEFAULT_NUM_PARAMS and start_lom_id == DEFAULT_START_LOM_ID:
+        new_param_section = _DEFAULT_PARAM_SECTION
+    else:
+        new_param_section = build_param_section(num_params, start_lom_id)
 
     # Try replacing empty version first
-    if '<ParameterSettings />' in xml_content:
-        xml_content = xml_content.replace('<ParameterSettings />', new_param_section)
+    if b'<ParameterSettings />' in xml_content:
+        xml_content = xml_content.replace(b'<ParameterSettings />', new_param_section)
     else:
         # Replace existing ParameterSettings section
-        xml_content = re.sub(
-            r'<ParameterSettings>.*?</ParameterSettings>',
-            new_param_section,
-            xml_content,
-            flags=re.DOTALL
-        )
+        xml_content = _PARAMETER_SETTINGS_RE.sub(lambda _: new_param_section, xml_content)
 
     return xml_content
 
@@ -85,7 +66,8 @@ def main():
     )
     parser.add_argument('input_file', type=str, help='Input .adg file')
     parser.add_argument('output_file', type=str, help='Output .adg file')
-    parser.add_argument('--params', type=int, default=128, help='Number of parameters to make visible (default: 128)')
+    parser.add_argument('--params', type=int, default=DEFAULT_NUM_PARAMS,
+                        help=f'Number of parameters to make visible (default: {DEFAULT_NUM_PARAMS})')
     parser.add_argument('--xml-output', type=str, help='Optional: Save intermediate XML for debugging')
 
     args = parser.parse_args()
@@ -105,19 +87,19 @@ def main():
     print(f"   Making parameters 101-{100 + args.params} visible...")
 
     # Extract ADG to XML
-    xml_content = extract_adg_to_xml(input_path)
+    xml_content = load_adg_bytes(input_path)
 
     # Add parameter visibility
     modified_xml = add_parameter_visibility(xml_content, args.params)
 
     # Save intermediate XML if requested
     if args.xml_output:
-        with open(args.xml_output, 'w') as f:
+        with open(args.xml_output, 'wb') as f:
             f.write(modified_xml)
         print(f"💾 Saved intermediate XML to {args.xml_output}")
 
     # Compress back to ADG
-    compress_xml_to_adg(modified_xml, output_path)
+    save_adg(modified_xml, output_path)
 
     print(f"✅ Successfully created {output_path.name}")
     print(f"   - Plugin parameters 101-{100 + args.params} are now visible")
@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 import gzip
 import argparse
+import shutil
 from pathlib import Path
 
+# Stream in 128 KB chunks instead of holding the whole file in memory
+COPY_BUFFER_SIZE = 1 << 17
+
 def convert_to_xml(device_path, xml_path):
     """Convert .adg or .adv file to .xml"""
     try:
         with gzip.open(device_path, 'rb') as f_in:
             with open(xml_path, 'wb') as f_out:
-                f_out.write(f_in.read())
+                shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE)
         print(f"Successfully converted {device_path} to {xml_path}")
     except Exception as e:
         print(f"Error converting to XML: {e}")
@@ -16,9 +20,10 @@ def convert_to_xml(device_path, xml_path):
 def convert_to_device(xml_path, device_path):
     """Convert .xml file to .adg or .adv"""
     try:
-        with open(xml_path, 'rb') as f_in:
-            with gzip.open(device_path, 'wb', compresslevel=6) as f_out:
-                f_out.write(f_in.read())
+        with open(xml_path, 'rb') as f_in, open(device_path, 'wb') as raw_out:
+            # mtime=0 and no filename match Ableton's own gzip header
+            with gzip.GzipFile(filename='', fileobj=raw_out, mode='wb', compresslevel=6, mtime=0) as f_out:
+                shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE)
         print(f"Successfully converted {xml_path} to {device_path}")
     except Exception as e:
         print(f"Error converting from XML: {e}")
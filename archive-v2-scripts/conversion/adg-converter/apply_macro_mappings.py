@@ -4,20 +4,30 @@ Apply macro mappings to Ableton drum rack (.adg) files
 Maps the first 8 plugin parameters (101-108) to macros 1-8
 """
 
-import gzip
+import sys
 import argparse
 import re
 from pathlib import Path
 
-def extract_adg_to_xml(adg_path):
-    """Extract .adg file to XML string"""
-    with gzip.open(adg_path, 'rb') as f:
-        return f.read().decode('utf-8')
-
-def compress_xml_to_adg(xml_content, adg_path):
-    """Compress XML string to .adg file"""
-    with gzip.open(adg_path, 'wb', compresslevel=6) as f:
-        f.write(xml_content.encode('utf-8'))
+# Add utils to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.adg_io import load_adg_bytes, save_adg
+from utils.plugin_parameters import build_param_section
+
+# Ableton racks expose at most 16 macros.
+# Everything is bytes: every tag touched here is ASCII
+MAX_MACROS = 16
+# Steps 1-3 of apply_macro_mappings as one alternation: a MacroDefaults.N
+# entry (group 1), the macro visibility flag, or an unmapped
+# PluginParameterSettings block (group 2 prefix, group 3 parameter id)
+_MAPPING_RE = re.compile(
+    rb'<MacroDefaults\.(\d+) Value="0" />'
+    rb'|<AreMacroControlsVisible Value="false" />'
+    rb'|(<ParameterId Value="(\d+)" />\s*'
+    rb'<Type Value="PluginFloatParameter" />\s*)'
+    rb'<MacroControlIndex Value="-1" />\s*'
+    rb'<MidiControllerRange />'
+)
 
 def add_parameter_visibility(xml_content, num_params=8, start_lom_id=76445):
     """
@@ -27,34 +37,13 @@ def add_parameter_visibility(xml_content, num_params=8, start_lom_id=76445):
     """
 
     # Check if ParameterSettings already exists with content
-    if '<PluginParameterSettings Id="0">' in xml_content:
+    if b'<PluginParameterSettings Id="0">' in xml_content:
         return xml_content  # Parameters already visible
 
-    # Generate the parameter settings
-    param_settings = []
-    for i in range(num_params):
-        param_id = 101 + i
-        lom_id = start_lom_id + i
-        index = i * 2
-
-        param_xml = f'''			<PluginParameterSettings Id="{i}">
-				<Index Value="{index}" />
-				<VisualIndex Value="{i}" />
-				<ParameterId Value="{param_id}" />
-				<Type Value="PluginFloatParameter" />
-				<MacroControlIndex Value="-1" />
-				<MidiControllerRange />
-				<LomId Value="{lom_id}" />
-			</PluginParameterSettings>'''
-        param_settings.append(param_xml)
-
-    # Join all parameter settings
-    full_param_settings = '\n'.join(param_settings)
-
     # Replace empty ParameterSettings with the full version
     xml_content = xml_content.replace(
-        '<ParameterSettings />',
-        f'<ParameterSettings>\n{full_param_settings}\n\t\t\t\t\t</ParameterSettings>'
+        b'<ParameterSettings />',
+        build_param_section(num_params, start_lom_id)
     )
 
     return xml_content
@@ -69,48 +58,43 @@ def apply_macro_mappings(xml_content, num_macros=8):
     3. Makes macro controls visible
     4. Maps plugin parameters 101-108 to macros 0-7
     5. Adds MidiControllerRange for each mapped parameter
+
+    xml_content is the UTF-8 XML as bytes.
     """
 
+    num_macros = min(num_macros, MAX_MACROS)
+
     # Step 0: Ensure parameters are visible
     xml_content = add_parameter_visibility(xml_content, num_macros)
 
-    # Step 1: Change MacroDefaults for first 8 macros from "0" to "-1"
-    for i in range(num_macros):
-        pattern = f'<MacroDefaults.{i} Value="0" />'
-        replacement = f'<MacroDefaults.{i} Value="-1" />'
-        xml_content = xml_content.replace(pattern, replacement)
-
-    # Step 2: Make macro controls visible
-    xml_content = xml_content.replace(
-        '<AreMacroControlsVisible Value="false" />',
-        '<AreMacroControlsVisible Value="true" />'
-    )
-
-    # Step 3: Map plugin parameters to macros
-    # Pattern to find: MacroControlIndex with value -1, followed by empty MidiControllerRange
-    for i in range(num_macros):
-        param_id = 101 + i  # Parameters 101-108
-
-        # Find the PluginParameterSettings block for this parameter
-        param_pattern = (
-            f'(<ParameterId Value="{param_id}" />\\s*'
-            f'<Type Value="PluginFloatParameter" />\\s*)'
-            f'<MacroControlIndex Value="-1" />\\s*'
-            f'<MidiControllerRange />'
-        )
-
-        param_replacement = (
-            f'\\1'
-            f'<MacroControlIndex Value="{i}" />\n'
-            f'\t\t\t\t\t\t<MidiControllerRange>\n'
-            f'\t\t\t\t\t\t\t<MidiControllerRange Id="0">\n'
-            f'\t\t\t\t\t\t\t\t<Min Value="0" />\n'
-            f'\t\t\t\t\t\t\t\t<Max Value="1" />\n'
-            f'\t\t\t\t\t\t\t</MidiControllerRange>\n'
-            f'\t\t\t\t\t\t</MidiControllerRange>'
-        )
-
-        xml_content = re.sub(param_pattern, param_replacement, xml_content, flags=re.DOTALL)
+    # Steps 1-3 in a single pass over the document
+    def replace_match(match):
+        if match.group(1) is not None:
+            # Step 1: Change MacroDefaults for the mapped macros from "0" to "-1"
+            i = int(match.group(1))
+            if i >= num_macros:
+                return match.group(0)
+            return b'<MacroDefaults.%d Value="-1" />' % i
+
+        if match.group(2) is None:
+            # Step 2: Make macro controls visible
+            return b'<AreMacroControlsVisible Value="true" />'
+
+        # Step 3: Map plugin parameters 101-108 to macros
+        i = int(match.group(3)) - 101
+        if not 0 <= i < num_macros:
+            return match.group(0)
+        return match.group(2) + (
+            b'<MacroControlIndex Value="%d" />\n'
+            b'\t\t\t\t\t\t<MidiControllerRange>\n'
+            b'\t\t\t\t\t\t\t<MidiControllerRange Id="0">\n'
+            b'\t\t\t\t\t\t\t\t<Min Value="0" />\n'
+            b'\t\t\t\t\t\t\t\t<Max Value="1" />\n'
+            b'\t\t\t\t\t\t\t</MidiControllerRange>\n'
+            b'\t\t\t\t\t\t</MidiControllerRange>'
+        ) % i
+
+    xml_content = _MAPPING_RE.sub(replace_match, xml_content)
 
     return xml_content
 
@@ -141,19 +125,19 @@ def main():
     print(f"   Mapping first {args.macros} parameters to macros...")
 
     # Extract ADG to XML
-    xml_content = extract_adg_to_xml(input_path)
+    xml_content = load_adg_bytes(input_path)
 
     # Apply macro mappings
     modified_xml = apply_macro_mappings(xml_content, args.macros)
 
     # Save intermediate XML if requested
     if args.xml_output:
-        with open(args.xml_output, 'w') as f:
+        with open(args.xml_output, 'wb') as f:
             f.write(modified_xml)
         print(f"💾 Saved intermediate XML to {args.xml_output}")
 
     # Compress back to ADG
-    compress_xml_to_adg(modified_xml, output_path)
+    save_adg(modified_xml, output_path)
 
     print(f"✅ Successfully created {output_path.name}")
     print(f"   - Plugin parameters 101-{100 + args.macros} made visible")
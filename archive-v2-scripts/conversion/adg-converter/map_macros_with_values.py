@@ -4,27 +4,42 @@ Map Ableton drum rack macros with specific parameter values
 Takes parameter values from Live API and maps them to macros with proper scaling
 """
 
-import gzip
+import sys
 import argparse
+import atexit
+import datetime
+import os
 import re
+import shlex
 from pathlib import Path
 
-def extract_adg_to_xml(adg_path):
-    """Extract .adg file to XML string"""
-    with gzip.open(adg_path, 'rb') as f:
-        return f.read().decode('utf-8')
-
-def compress_xml_to_adg(xml_content, adg_path):
-    """Compress XML string to .adg file"""
-    with gzip.open(adg_path, 'wb', compresslevel=6) as f:
-        f.write(xml_content.encode('utf-8'))
+# Add utils to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.adg_io import load_adg_bytes, save_adg
+
+# MacroControls.N sections (group 1) or MacroDefaults.N entries (group 2)
+# Patterns are bytes: every tag touched here is ASCII, so the XML never needs
+# a UTF-8 decode/encode round-trip
+_MACRO_SECTION_OR_DEFAULT_RE = re.compile(
+    rb'<MacroControls\.(\d+)>.*?</MacroControls\.\1>'
+    rb'|<MacroDefaults\.(\d+) Value="[^"]*" />',
+    re.DOTALL
+)
+_MANUAL_RE = re.compile(rb'<Manual Value="[^"]*" />')
+# Unmapped PluginParameterSettings block; group 2 is the parameter id
+_UNMAPPED_PARAM_RE = re.compile(
+    rb'(<ParameterId Value="(\d+)" />\s*'
+    rb'<Type Value="PluginFloatParameter" />\s*)'
+    rb'<MacroControlIndex Value="-1" />\s*'
+    rb'<MidiControllerRange />'
+)
 
 def map_macros_with_values(xml_content, param_values, num_macros=16):
     """
     Map plugin parameters to macros with specific values
 
     Args:
-        xml_content: The drum rack XML content
+        xml_content: The drum rack XML content as UTF-8 bytes
         param_values: List of 16 parameter values (0.0-1.0 range)
         num_macros: Number of macros to map (default 16, max supported by Ableton is 8)
 
@@ -38,100 +53,78 @@ def map_macros_with_values(xml_content, param_values, num_macros=16):
 
     # Limit to 16 macros (Ableton's limit for rack device macros)
     num_macros = min(num_macros, 16)
-
-    # Step 1: Set MacroControls Manual values based on parameter values
-    for i in range(num_macros):
-        if i < len(param_values):
+    num_values = min(num_macros, len(param_values))
+    seen_sections = set()
+
+    # Steps 1-2 in one pass: the first MacroControls.N section gets its Manual
+    # value from param_value * 127, and MacroDefaults.N is set to "-1"
+    def replace_macro(match):
+        if match.group(1) is not None:
+            i = int(match.group(1))
+            if i >= num_values or i in seen_sections:
+                return match.group(0)
+            seen_sections.add(i)
             # Scale from 0-1 to 0-127
             macro_value = param_values[i] * 127.0
+            manual = f'<Manual Value="{macro_value}" />'.encode()
+            return _MANUAL_RE.sub(lambda _: manual, match.group(0))
 
-            # Find the entire MacroControls.N section and replace its Manual value
-            macro_section_pattern = f'<MacroControls\\.{i}>(.*?)</MacroControls\\.{i}>'
-            match = re.search(macro_section_pattern, xml_content, flags=re.DOTALL)
-
-            if match:
-                old_section = match.group(0)
-                # Within this section, replace the Manual value
-                new_section = re.sub(
-                    r'<Manual Value="[^"]*" />',
-                    f'<Manual Value="{macro_value}" />',
-                    old_section
-                )
-                xml_content = xml_content.replace(old_section, new_section)
-
-    # Step 2: Set MacroDefaults to -1 for active macros
-    for i in range(num_macros):
-        pattern = f'<MacroDefaults.{i} Value="[^"]*" />'
-        replacement = f'<MacroDefaults.{i} Value="-1" />'
-        xml_content = re.sub(pattern, replacement, xml_content)
+        i = int(match.group(2))
+        if i >= num_macros:
+            return match.group(0)
+        return b'<MacroDefaults.%d Value="-1" />' % i
+
+    xml_content = _MACRO_SECTION_OR_DEFAULT_RE.sub(replace_macro, xml_content)
 
     # Step 3: Make macro controls visible
     xml_content = xml_content.replace(
-        '<AreMacroControlsVisible Value="false" />',
-        '<AreMacroControlsVisible Value="true" />'
+        b'<AreMacroControlsVisible Value="false" />',
+        b'<AreMacroControlsVisible Value="true" />'
     )
 
-    # Step 4: Map plugin parameters to macros
-    for i in range(num_macros):
-        param_id = 101 + i  # Parameters 101-116
-
-        # Find the PluginParameterSettings block for this parameter
-        param_pattern = (
-            f'(<ParameterId Value="{param_id}" />\\s*'
-            f'<Type Value="PluginFloatParameter" />\\s*)'
-            f'<MacroControlIndex Value="-1" />\\s*'
-            f'<MidiControllerRange />'
+    # Step 4: Map plugin parameters 101-116 to macros in one pass
+    def replace_param(match):
+        i = int(match.group(2)) - 101
+        if not 0 <= i < num_macros:
+            return match.group(0)
+        return (
+            match.group(1) +
+            b'<MacroControlIndex Value="%d" />\n' % i +
+            b'\t\t\t\t\t\t<MidiControllerRange>\n'
+            b'\t\t\t\t\t\t\t<MidiControllerRange Id="0">\n'
+            b'\t\t\t\t\t\t\t\t<Min Value="0" />\n'
+            b'\t\t\t\t\t\t\t\t<Max Value="1" />\n'
+            b'\t\t\t\t\t\t\t</MidiControllerRange>\n'
+            b'\t\t\t\t\t\t</MidiControllerRange>'
         )
 
-        param_replacement = (
-            f'\\1'
-            f'<MacroControlIndex Value="{i}" />\n'
-            f'\t\t\t\t\t\t<MidiControllerRange>\n'
-            f'\t\t\t\t\t\t\t<MidiControllerRange Id="0">\n'
-            f'\t\t\t\t\t\t\t\t<Min Value="0" />\n'
-            f'\t\t\t\t\t\t\t\t<Max Value="1" />\n'
-            f'\t\t\t\t\t\t\t</MidiControllerRange>\n'
-            f'\t\t\t\t\t\t</MidiControllerRange>'
-        )
-
-        xml_content = re.sub(param_pattern, param_replacement, xml_content, flags=re.DOTALL)
+    xml_content = _UNMAPPED_PARAM_RE.sub(replace_param, xml_content)
 
     return xml_content
 
-def main():
-    # Add logging to temp folder
-    import sys
-    import datetime
+LOG_FILE = '/Users/Shared/DevWork/GitHub/Looping/temp/mapper_log.txt'
+COMPLETION_FLAG = '/Users/Shared/DevWork/GitHub/Looping/temp/mapper_done.flag'
 
-    log_file = '/Users/Shared/DevWork/GitHub/Looping/temp/mapper_log.txt'
+_log_file = None
 
-    def log(message):
-        with open(log_file, 'a') as f:
-            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            f.write(f"[{timestamp}] {message}\n")
-        print(message)
+def log(message):
+    """Append a timestamped line to the mapper log and echo it"""
+    global _log_file
+    if _log_file is None:
+        # One buffered handle per process, flushed when it is closed at exit
+        _log_file = open(LOG_FILE, 'a', buffering=8192)
+        atexit.register(_log_file.close)
+    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    _log_file.write(f"[{timestamp}] {message}\n")
+    print(message)
 
-    log("=== Script started ===")
-    log(f"Arguments: {sys.argv}")
-
-    parser = argparse.ArgumentParser(
-        description='Map drum rack macros with specific parameter values from Live API',
-        epilog='Example: python map_macros_with_values.py input.adg output.adg --values 0.1 0.2 0.3 0.4 0.5 0.6 0.7 0.8'
-    )
-    parser.add_argument('input_file', type=str, help='Input .adg file')
-    parser.add_argument('output_file', type=str, help='Output .adg file')
-    parser.add_argument('--values', type=float, nargs='+', required=True,
-                        help='16 parameter values (0.0-1.0) from Live API')
-    parser.add_argument('--macros', type=int, default=16,
-                        help='Number of macros to map (default: 16, max: 16)')
-    parser.add_argument('--xml-output', type=str, help='Optional: Save intermediate XML for debugging')
-
-    args = parser.parse_args()
-    log(f"Parsed args: input={args.input_file}, output={args.output_file}, values={args.values}")
-
-    input_path = Path(args.input_file)
-    output_path = Path(args.output_file)
+def map_file(input_path, output_path, values, num_macros=16, xml_output=None):
+    """
+    Map one .adg file and write the completion flag for Max
 
+    Returns:
+        int: 0 on success, 1 on invalid input
+    """
     if not input_path.exists():
         msg = f"❌ Error: Input file {input_path} does not exist"
         log(msg)
@@ -142,50 +135,128 @@ def main():
         log(msg)
         return 1
 
-    if len(args.values) < args.macros:
-        msg = f"❌ Error: Need at least {args.macros} values, got {len(args.values)}"
+    if len(values) < num_macros:
+        msg = f"❌ Error: Need at least {num_macros} values, got {len(values)}"
         log(msg)
         return 1
 
     log(f"🔧 Mapping macros for {input_path.name}")
     print(f"🔧 Mapping macros for {input_path.name}")
-    print(f"   Mapping first {args.macros} parameters to macros with values:")
-    for i in range(min(args.macros, len(args.values))):
-        print(f"      Param {101+i} ({args.values[i]:.3f}) → Macro {i+1} ({args.values[i] * 127:.1f})")
+    print(f"   Mapping first {num_macros} parameters to macros with values:")
+    for i in range(min(num_macros, len(values))):
+        print(f"      Param {101+i} ({values[i]:.3f}) → Macro {i+1} ({values[i] * 127:.1f})")
 
     # Extract ADG to XML
     log("Extracting ADG to XML...")
-    xml_content = extract_adg_to_xml(input_path)
+    xml_content = load_adg_bytes(input_path)
     log(f"Extracted {len(xml_content)} bytes")
 
     # Apply macro mappings with values
     log("Applying macro mappings...")
-    modified_xml = map_macros_with_values(xml_content, args.values, args.macros)
+    modified_xml = map_macros_with_values(xml_content, values, num_macros)
     log("Mappings applied")
 
     # Save intermediate XML if requested
-    if args.xml_output:
-        with open(args.xml_output, 'w') as f:
+    if xml_output:
+        with open(xml_output, 'wb') as f:
             f.write(modified_xml)
-        print(f"💾 Saved intermediate XML to {args.xml_output}")
+        print(f"💾 Saved intermediate XML to {xml_output}")
 
     # Compress back to ADG
     log(f"Compressing to {output_path}...")
-    compress_xml_to_adg(modified_xml, output_path)
+    save_adg(modified_xml, output_path)
     log(f"✅ Successfully created {output_path}")
 
     print(f"✅ Successfully created {output_path.name}")
-    print(f"   - Parameters 101-{100 + args.macros} mapped to macros 1-{args.macros}")
+    print(f"   - Parameters 101-{100 + num_macros} mapped to macros 1-{num_macros}")
     print(f"   - Macro values set from Live API parameter values")
     print(f"   - Macro controls visible")
 
     # Write completion flag for Max to detect
-    completion_flag = '/Users/Shared/DevWork/GitHub/Looping/temp/mapper_done.flag'
-    with open(completion_flag, 'w') as f:
-        f.write(f"DONE: {output_path}\n")
-    log(f"Wrote completion flag: {completion_flag}")
+    fd = os.open(COMPLETION_FLAG, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, f"DONE: {output_path}\n".encode('utf-8'))
+    finally:
+        os.close(fd)
+    log(f"Wrote completion flag: {COMPLETION_FLAG}")
 
     return 0
 
+def parse_fast_args(argv):
+    """
+    Hand-parse the common 'input output --values v1 ... vN' call from Max
+
+    Returns:
+        tuple | None: (input_file, output_file, values), or None when argv
+        uses any other option and needs the full argparse parser
+    """
+    if len(argv) < 4 or argv[2] != '--values' or argv[0].startswith('-') or argv[1].startswith('-'):
+        return None
+    try:
+        values = [float(v) for v in argv[3:]]
+    except ValueError:
+        return None
+    return argv[0], argv[1], values
+
+def run_daemon(num_macros=16):
+    """
+    Map one file per stdin line ('input output v1 ... vN') in a single process
+
+    Amortizes interpreter startup across many mappings. Each line is
+    acknowledged on stdout with 'DONE: <output>' or 'FAILED: <output>'.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        output_file = ''
+        try:
+            input_file, output_file, *values = shlex.split(line)
+            result = map_file(Path(input_file), Path(output_file),
+                              [float(v) for v in values], num_macros)
+        except Exception as e:
+            log(f"❌ Error: {e}")
+            result = 1
+        if _log_file is not None:
+            _log_file.flush()
+        print(f"{'DONE' if result == 0 else 'FAILED'}: {output_file}", flush=True)
+    return 0
+
+def main():
+    log("=== Script started ===")
+    log(f"Arguments: {sys.argv}")
+
+    argv = sys.argv[1:]
+    if '--daemon' in argv:
+        return run_daemon()
+
+    fast_args = parse_fast_args(argv)
+    if fast_args:
+        input_file, output_file, values = fast_args
+        num_macros = 16
+        xml_output = None
+    else:
+        parser = argparse.ArgumentParser(
+            description='Map drum rack macros with specific parameter values from Live API',
+            epilog='Example: python map_macros_with_values.py input.adg output.adg --values 0.1 0.2 0.3 0.4 0.5 0.6 0.7 0.8'
+        )
+        parser.add_argument('input_file', type=str, help='Input .adg file')
+        parser.add_argument('output_file', type=str, help='Output .adg file')
+        parser.add_argument('--values', type=float, nargs='+', required=True,
+                            help='16 parameter values (0.0-1.0) from Live API')
+        parser.add_argument('--macros', type=int, default=16,
+                            help='Number of macros to map (default: 16, max: 16)')
+        parser.add_argument('--xml-output', type=str, help='Optional: Save intermediate XML for debugging')
+        parser.add_argument('--daemon', action='store_true',
+                            help="Read 'input output v1 ... vN' lines from stdin until EOF")
+
+        args = parser.parse_args(argv)
+        input_file, output_file, values = args.input_file, args.output_file, args.values
+        num_macros = args.macros
+        xml_output = args.xml_output
+
+    log(f"Parsed args: input={input_file}, output={output_file}, values={values}")
+
+    return map_file(Path(input_file), Path(output_file), values, num_macros, xml_output)
+
 if __name__ == "__main__":
     exit(main())
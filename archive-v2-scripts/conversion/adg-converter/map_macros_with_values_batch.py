@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Map macros with parameter values for many drum rack (.adg) files in one run
+Overlaps file reads, deflate and writes across files using asyncio worker threads
+"""
+
+import sys
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+# Add utils to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.adg_io import load_adg_bytes, save_adg
+from map_macros_with_values import map_macros_with_values
+
+def process_job(job):
+    """
+    Map a single job: {"input": ..., "output": ..., "values": [...], "macros": 16}
+
+    Returns:
+        tuple: (output path, error message or None)
+    """
+    output_path = Path(job['output'])
+    try:
+        input_path = Path(job['input'])
+        values = [float(v) for v in job['values']]
+        num_macros = int(job.get('macros', 16))
+
+        if input_path.suffix.lower() != '.adg':
+            return output_path, "Input file must be .adg"
+        if len(values) < num_macros:
+            return output_path, f"Need at least {num_macros} values, got {len(values)}"
+
+        # zlib releases the GIL, so inflate/deflate of one file overlaps with
+        # reads and writes of the others
+        xml_content = load_adg_bytes(input_path)
+        modified_xml = map_macros_with_values(xml_content, values, num_macros)
+        save_adg(modified_xml, output_path)
+        return output_path, None
+    except Exception as e:
+        return output_path, str(e)
+
+async def run_jobs(jobs, workers):
+    """Run all jobs concurrently, at most `workers` at a time"""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run_one(job):
+        async with semaphore:
+            return await loop.run_in_executor(None, process_job, job)
+
+    return await asyncio.gather(*(run_one(job) for job in jobs))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Map drum rack macros with parameter values for a batch of files',
+        epilog='Example: python map_macros_with_values_batch.py jobs.json'
+    )
+    parser.add_argument('jobs_file', type=str,
+                        help='JSON list of {"input", "output", "values", "macros"} jobs ("-" for stdin)')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Number of files processed concurrently (default: 8)')
+
+    args = parser.parse_args()
+
+    if args.jobs_file == '-':
+        jobs = json.load(sys.stdin)
+    else:
+        with open(args.jobs_file) as f:
+            jobs = json.load(f)
+
+    print(f"🔧 Mapping macros for {len(jobs)} files...")
+
+    results = asyncio.run(run_jobs(jobs, max(1, args.workers)))
+
+    failed = 0
+    for output_path, error in results:
+        if error:
+            failed += 1
+            print(f"❌ {output_path.name}: {error}")
+        else:
+            print(f"✅ {output_path.name}")
+
+    print(f"\nProcessing complete: {len(results) - failed} of {len(results)} files mapped")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -3,52 +3,65 @@
 Simple test script to set drum rack macro values
 """
 
-import gzip
+import sys
 import re
 from pathlib import Path
 
-def extract_adg_to_xml(adg_path):
-    """Extract .adg file to XML string"""
-    with gzip.open(adg_path, 'rb') as f:
-        return f.read().decode('utf-8')
+# Add utils to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.adg_io import load_adg_bytes, save_adg
 
-def compress_xml_to_adg(xml_content, adg_path):
-    """Compress XML string to .adg file"""
-    with gzip.open(adg_path, 'wb', compresslevel=6) as f:
-        f.write(xml_content.encode('utf-8'))
+# Patterns are bytes: every tag touched here is ASCII
+# A MacroControls.N section up to its first Manual value; group 2 is N.
+# The scan steps tag by tag and cannot run past </MacroControls, so a
+# malformed section fails fast instead of dragging a DOTALL .*? to the end.
+_MACRO_MANUAL_RE = re.compile(
+    rb'(<MacroControls\.(\d+)>(?:[^<]*<(?!Manual |/MacroControls)[^>]*>)*?[^<]*<Manual Value=")[^"]*(" />)'
+)
+
+MAX_MACROS = 16
 
 def set_macro_values(xml_content, macro_values):
     """
     Set macro Manual values
 
     Args:
-        xml_content: The drum rack XML
-        macro_values: List of 16 values (0-127 range)
+        xml_content: The drum rack XML as UTF-8 bytes
+        macro_values: List of up to 16 values (0-127 range)
+
+    Raises:
+        ValueError: If there are more than 16 values or one is outside 0-127
     """
+    # Validate everything up front so the substitution pass needs no guards
+    if len(macro_values) > MAX_MACROS:
+        raise ValueError(f"Expected at most {MAX_MACROS} macro values, got {len(macro_values)}")
+    for i, value in enumerate(macro_values):
+        if not 0 <= float(value) <= 127:
+            raise ValueError(f"Macro {i+1} value {value} is outside the 0-127 range")
+
+    found = set()
+    # Format every value once, outside the substitution callback
+    replacements = [str(value).encode() for value in macro_values]
+
+    def replace_manual(match):
+        # Only the first MacroControls.N section (the outer rack's) is updated
+        i = int(match.group(2))
+        if i >= len(replacements) or i in found:
+            return match.group(0)
+        found.add(i)
+        return match.group(1) + replacements[i] + match.group(3)
+
+    # One pass over the document rewrites every macro's Manual value
+    xml_content = _MACRO_MANUAL_RE.sub(replace_manual, xml_content)
 
+    # Report every macro with a single write
+    lines = []
     for i, value in enumerate(macro_values):
-        # Find the MacroControls.N section and replace the Manual value
-        # Simple approach: find the line and replace it directly
-
-        # Pattern to match: <Manual Value="anything" /> within a MacroControls.N block
-        # We'll find the MacroControls.N block and replace its Manual value line
-
-        # First, find the entire MacroControls.N section
-        macro_section_pattern = f'<MacroControls\\.{i}>(.*?)</MacroControls\\.{i}>'
-        match = re.search(macro_section_pattern, xml_content, flags=re.DOTALL)
-
-        if match:
-            old_section = match.group(0)
-            # Within this section, replace the Manual value
-            new_section = re.sub(
-                r'<Manual Value="[^"]*" />',
-                f'<Manual Value="{value}" />',
-                old_section
-            )
-            xml_content = xml_content.replace(old_section, new_section)
-            print(f"  ✓ Set Macro {i+1} to {value}")
+        if i in found:
+            lines.append(f"  ✓ Set Macro {i+1} to {value}")
         else:
-            print(f"  ✗ Could not find MacroControls.{i}")
+            lines.append(f"  ✗ Could not find MacroControls.{i}")
+    print("\n".join(lines))
 
     return xml_content
 
@@ -63,9 +76,9 @@ print(f"Output: {output_file}\n")
 # Test values (scaled 0-127): macros 7,8,9,13 should be non-zero
 test_values = [0, 0, 0, 0, 0, 0, 63.5, 63.5, 127, 0, 0, 0, 127, 0, 0, 0]
 
-xml = extract_adg_to_xml(input_file)
+xml = load_adg_bytes(input_file)
 modified = set_macro_values(xml, test_values)
-compress_xml_to_adg(modified, output_file)
+save_adg(modified, output_file)
 
 print(f"\n✅ Created {output_file}")
 print("Load in Ableton and check if macros 7, 8, 9, 13 are set correctly")
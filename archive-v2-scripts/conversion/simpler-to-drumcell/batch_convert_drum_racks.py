@@ -7,26 +7,27 @@ and saves the results with a suffix or to an output directory.
 """
 
 import sys
+import gzip
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.decoder import decode_adg
-from utils.encoder import encode_adg
+from utils.encoder import encode_adg_tree
 
-# Import the drum rack converter
-from conversion.drum_rack_simpler_to_drumcell import find_and_convert_simplers
-import xml.etree.ElementTree as ET
+# Import the drum rack converter, and parse with the same tree backend it uses
+from conversion.drum_rack_simpler_to_drumcell import find_and_convert_simplers, ET, _PARSER
 
 
-def process_drum_rack(input_path, output_path, dry_run=False):
+def process_drum_rack(input_path, output_path, dry_run=False, report=None):
     """Process a single drum rack file"""
     try:
         # Decode drum rack
-        rack_xml = decode_adg(input_path)
-        rack_root = ET.fromstring(rack_xml)
+        with gzip.open(input_path, 'rb') as f:
+            rack_root = ET.parse(f, _PARSER).getroot()
 
         # Check if it has any Simplers
         simplers = rack_root.findall('.//OriginalSimpler')
@@ -37,14 +38,13 @@ def process_drum_rack(input_path, output_path, dry_run=False):
             return {'status': 'would_convert', 'converted': len(simplers)}
 
         # Convert all simplers
-        converted, skipped = find_and_convert_simplers(rack_root)
+        converted, skipped = find_and_convert_simplers(rack_root, report)
 
         if converted == 0:
             return {'status': 'skipped', 'reason': 'no_conversion', 'converted': 0}
 
         # Encode result
-        result_xml = ET.tostring(rack_root, encoding='unicode', xml_declaration=True)
-        encode_adg(result_xml, output_path)
+        encode_adg_tree(ET.ElementTree(rack_root), output_path)
 
         return {'status': 'success', 'converted': converted, 'skipped': skipped}
 
@@ -52,6 +52,14 @@ def process_drum_rack(input_path, output_path, dry_run=False):
         return {'status': 'error', 'error': str(e), 'converted': 0}
 
 
+def process_drum_rack_captured(input_path, output_path, dry_run=False):
+    """Process a single drum rack in a worker process, returning its pad report with the result"""
+    report = []
+    result = process_drum_rack(input_path, output_path, dry_run, report)
+    result['report'] = ''.join(line + '\n' for line in report)
+    return result
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Batch convert all Simplers to DrumCells in drum racks'
@@ -87,6 +95,12 @@ def main():
         action='store_true',
         help='Suppress per-file output'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes (default: CPU count)'
+    )
 
     args = parser.parse_args()
 
@@ -136,8 +150,9 @@ def main():
 
     start_time = datetime.now()
 
-    for idx, input_path in enumerate(adg_files, 1):
-        # Determine output path
+    # Determine output paths up front so the racks can be converted in parallel
+    output_paths = []
+    for input_path in adg_files:
         if args.in_place:
             output_path = input_path
         elif args.output_dir:
@@ -149,30 +164,36 @@ def main():
             # Add suffix
             stem = input_path.stem
             output_path = input_path.parent / f"{stem}{args.suffix}.adg"
+        output_paths.append(output_path)
 
-        if not args.quiet:
-            print(f"[{idx}/{len(adg_files)}] {input_path.relative_to(input_dir)}")
+    # Each rack's decode/convert/encode is independent; results come back in order
+    worker = functools.partial(process_drum_rack_captured, dry_run=args.dry_run)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        results = executor.map(worker, adg_files, output_paths)
 
-        result = process_drum_rack(input_path, output_path, args.dry_run)
-
-        if result['status'] == 'success':
-            stats['converted'] += 1
-            stats['total_simplers'] += result['converted']
-            if not args.quiet:
-                print(f"  ✓ Converted {result['converted']} Simpler(s)")
-        elif result['status'] == 'would_convert':
-            stats['converted'] += 1
-            stats['total_simplers'] += result['converted']
-            if not args.quiet:
-                print(f"  → Would convert {result['converted']} Simpler(s)")
-        elif result['status'] == 'skipped':
-            stats['skipped'] += 1
+        for idx, (input_path, result) in enumerate(zip(adg_files, results), 1):
             if not args.quiet:
-                reason = result.get('reason', 'unknown')
-                print(f"  ⏭️  Skipped ({reason})")
-        elif result['status'] == 'error':
-            stats['errors'] += 1
-            print(f"  ✗ Error: {result['error']}")
+                print(f"[{idx}/{len(adg_files)}] {input_path.relative_to(input_dir)}")
+            sys.stdout.write(result['report'])
+
+            if result['status'] == 'success':
+                stats['converted'] += 1
+                stats['total_simplers'] += result['converted']
+                if not args.quiet:
+                    print(f"  ✓ Converted {result['converted']} Simpler(s)")
+            elif result['status'] == 'would_convert':
+                stats['converted'] += 1
+                stats['total_simplers'] += result['converted']
+                if not args.quiet:
+                    print(f"  → Would convert {result['converted']} Simpler(s)")
+            elif result['status'] == 'skipped':
+                stats['skipped'] += 1
+                if not args.quiet:
+                    reason = result.get('reason', 'unknown')
+                    print(f"  ⏭️  Skipped ({reason})")
+            elif result['status'] == 'error':
+                stats['errors'] += 1
+                print(f"  ✗ Error: {result['error']}")
 
     elapsed = datetime.now() - start_time
 
@@ -7,29 +7,49 @@ devices to DrumCell devices, replicating Ableton's built-in conversion.
 """
 
 import sys
-import xml.etree.ElementTree as ET
+import gzip
 from pathlib import Path
 
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.decoder import decode_adg
-from utils.encoder import encode_adg
+from utils.encoder import encode_adg_tree
 
-# Import the single simpler converter
-from conversion.simpler_to_drumcell import simpler_to_drumcell, create_drumcell_template
+# Import the single simpler converter, with its tree backend and shared parser
+from conversion.simpler_to_drumcell import ET, _PARSER, _simpler_element_to_drumcell_element
 
 
-def find_and_convert_simplers(rack_root):
+def find_and_convert_simplers(rack_root, report=None):
     """Find all OriginalSimpler devices in the rack and convert them to DrumCell"""
+    # The per-pad lines go to the caller's list when one is given; otherwise
+    # they are written once at the end rather than one terminal write per pad
+    lines = [] if report is None else report
+    try:
+        return _find_and_convert_simplers(rack_root, lines)
+    finally:
+        if report is None:
+            sys.stdout.write(''.join(line + '\n' for line in lines))
 
+
+def _find_and_convert_simplers(rack_root, report):
     # Find all DrumBranchPreset elements (individual pads)
     branch_presets = rack_root.findall('.//DrumBranchPreset')
 
-    print(f"\n📊 Found {len(branch_presets)} pads in drum rack")
+    report.append(f"\n📊 Found {len(branch_presets)} pads in drum rack")
+
+    # One existence check instead of walking every branch of an already-converted rack
+    if rack_root.find('.//OriginalSimpler') is None:
+        report.append("  ⏭️  No OriginalSimpler devices found, nothing to convert")
+        return 0, len(branch_presets)
 
     converted_count = 0
     skipped_count = 0
 
+    # lxml elements know their parent; ElementTree needs a one-off parent map
+    if hasattr(rack_root, 'getparent'):
+        parent_map = None
+    else:
+        parent_map = {child: parent for parent in rack_root.iter() for child in parent}
+
     for idx, branch_preset in enumerate(branch_presets):
         # Find the device container
         device_elem = branch_preset.find('.//Device')
@@ -47,70 +67,56 @@ def find_and_convert_simplers(rack_root):
 
             if len(sample_parts) > 1:
                 # Multi-sample Simpler with multiple zones/velocity layers
-                print(f"  ⏭️  Pad {idx + 1}: Skipping multi-sample Simpler ({len(sample_parts)} zones)")
+                report.append(f"  ⏭️  Pad {idx + 1}: Skipping multi-sample Simpler ({len(sample_parts)} zones)")
                 skipped_count += 1
                 continue
 
-            # Get sample name for logging
-            sample_ref = simpler.find('.//MultiSamplePart/SampleRef/FileRef/Path')
+            # Get sample name for logging (relative to the part already found, no second subtree walk)
+            sample_ref = sample_parts[0].find('SampleRef/FileRef/Path') if sample_parts else None
             sample_path = sample_ref.get('Value') if sample_ref is not None else 'Unknown'
             sample_name = Path(sample_path).name if sample_path != 'Unknown' else 'Empty'
 
-            print(f"  🔄 Pad {idx + 1}: Converting Simpler → {sample_name}")
-
-            # Convert the Simpler to DrumCell XML string
-            simpler_xml_str = ET.tostring(simpler, encoding='unicode')
+            report.append(f"  🔄 Pad {idx + 1}: Converting Simpler → {sample_name}")
 
-            # Wrap in Ableton root for conversion
-            wrapped_simpler = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Ableton MajorVersion="5" MinorVersion="12.0_12300" SchemaChangeCount="1" Creator="Ableton Live 12.3b12" Revision="a51ffacdd96935f4e75c565b931d9d81c161dfb8">
-{simpler_xml_str}
-</Ableton>"""
-
-            # Convert using existing converter
-            drumcell_xml_str = simpler_to_drumcell(wrapped_simpler)
+            # Convert the Simpler element in place of a serialize/parse round-trip
+            drumcell = _simpler_element_to_drumcell_element(simpler)
 
             # Check if conversion was skipped (empty pad)
-            if drumcell_xml_str is None:
-                print(f"    ⏭️  Skipped empty pad")
+            if drumcell is None:
+                report.append(f"    ⏭️  Skipped empty pad")
                 skipped_count += 1
                 continue
 
-            # Parse the converted DrumCell
-            drumcell_root = ET.fromstring(drumcell_xml_str)
-            drumcell = drumcell_root.find('DrumCell')
+            # IMPORTANT: Add Id="0" attribute to DrumCell (required by Ableton)
+            # Get the Id from the original Simpler if it exists
+            simpler_id = simpler.get('Id', '0')
+            drumcell.set('Id', simpler_id)
 
-            if drumcell is not None:
-                # IMPORTANT: Add Id="0" attribute to DrumCell (required by Ableton)
-                # Get the Id from the original Simpler if it exists
-                simpler_id = simpler.get('Id', '0')
-                drumcell.set('Id', simpler_id)
-
-                # Remove the old Simpler
-                device_elem.remove(simpler)
-
-                # Add the new DrumCell
-                device_elem.append(drumcell)
-
-                # IMPORTANT: Update PresetRef DeviceId from "OriginalSimpler" to "DrumCell"
-                # Find the parent AbletonDevicePreset
-                for parent in branch_preset.iter():
-                    if device_elem in parent:
-                        preset_ref = parent.find('PresetRef')
-                        if preset_ref is not None:
-                            device_id = preset_ref.find('.//DeviceId')
-                            if device_id is not None and device_id.get('Name') == 'OriginalSimpler':
-                                device_id.set('Name', 'DrumCell')
-                        break
-
-                converted_count += 1
+            # Remove the old Simpler
+            device_elem.remove(simpler)
+
+            # Add the new DrumCell
+            device_elem.append(drumcell)
+
+            # IMPORTANT: Update PresetRef DeviceId from "OriginalSimpler" to "DrumCell"
+            # Find the parent AbletonDevicePreset
+            if parent_map is None:
+                parent = device_elem.getparent()
             else:
-                print(f"    ⚠️  Failed to convert pad {idx + 1}")
+                parent = parent_map.get(device_elem)
+            if parent is not None:
+                preset_ref = parent.find('PresetRef')
+                if preset_ref is not None:
+                    device_id = preset_ref.find('.//DeviceId')
+                    if device_id is not None and device_id.get('Name') == 'OriginalSimpler':
+                        device_id.set('Name', 'DrumCell')
+
+            converted_count += 1
         else:
             # Check if it's already a DrumCell or empty
             drumcell = device_elem.find('DrumCell')
             if drumcell is not None:
-                print(f"  ⏭️  Pad {idx + 1}: Already DrumCell, skipping")
+                report.append(f"  ⏭️  Pad {idx + 1}: Already DrumCell, skipping")
             skipped_count += 1
 
     return converted_count, skipped_count
@@ -134,16 +140,16 @@ def main():
 
     # Decode drum rack
     print(f"\n📖 Reading: {input_path.name}")
-    rack_xml = decode_adg(input_path)
-    rack_root = ET.fromstring(rack_xml)
+    # Parse straight from the gzip stream so the decompressed XML is never held as one buffer
+    with gzip.open(input_path, 'rb') as f:
+        rack_root = ET.parse(f, _PARSER).getroot()
 
     # Convert all simplers
     converted, skipped = find_and_convert_simplers(rack_root)
 
     # Encode result
     print(f"\n💾 Writing: {output_path.name}")
-    result_xml = ET.tostring(rack_root, encoding='unicode', xml_declaration=True)
-    encode_adg(result_xml, output_path)
+    encode_adg_tree(ET.ElementTree(rack_root), output_path)
 
     # Summary
     print("\n" + "="*80)
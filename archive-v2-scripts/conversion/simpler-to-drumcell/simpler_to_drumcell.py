@@ -4,21 +4,51 @@ Convert Ableton Simpler (.adv) to DrumCell (.adv)
 
 Replicates Ableton's built-in "Convert Simpler to Drum Rack" functionality
 by mapping OriginalSimpler XML structure to DrumCell XML structure.
+
+Performance note: conversion is bound by XML tree building and pointer
+chasing, not arithmetic. For the string API, parsing the Simpler and
+serializing the DrumCell take about half the time, cloning the template
+about an eighth, and the parameter mappings the rest. The gains come from
+a C parser (lxml), doing less tree work (cached template, one-walk section
+index) and skipping the string round-trip (_simpler_element_to_drumcell_element).
+Run the CLI with --profile to see where the time goes before optimizing further.
 """
 
+import re
 import sys
-import xml.etree.ElementTree as ET
+import copy
+import pstats
+import logging
+import cProfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Prefer lxml's C tree when available; the API used here matches ElementTree.
+# drum_rack_simpler_to_drumcell shares this backend and parser, so converted
+# DrumCell elements can be appended straight into a rack tree.
+try:
+    from lxml import etree as ET
+    # One parser for every parse; Ableton XML needs neither ID indexing nor entities
+    _PARSER = ET.XMLParser(huge_tree=True, remove_blank_text=False,
+                           collect_ids=False, resolve_entities=False)
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _PARSER = None
+
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.decoder import decode_adg
+from utils.decoder import decode_adg_bytes
 from utils.encoder import encode_adg
 
+# Conversion details go through logging so bulk callers pay nothing for them;
+# the CLI enables INFO output in main()
+log = logging.getLogger(__name__)
+_RULE = "=" * 60
+_XML_HEADER = b'<?xml version="1.0" encoding="UTF-8"?>\n'
 
-def create_drumcell_template():
-    """Create a basic DrumCell XML structure with default values"""
-    template = """<?xml version="1.0" encoding="UTF-8"?>
+
+# Basic DrumCell XML structure with default values
+_DRUMCELL_TEMPLATE_XML = """<?xml version="1.0" encoding="UTF-8"?>
 <Ableton MajorVersion="5" MinorVersion="12.0_12300" SchemaChangeCount="1" Creator="Ableton Live 12.3b12" Revision="a51ffacdd96935f4e75c565b931d9d81c161dfb8">
 	<DrumCell>
 		<LomId Value="0" />
@@ -608,21 +638,62 @@ def create_drumcell_template():
 		<NotePitchBend Value="true" />
 	</DrumCell>
 </Ableton>"""
-    return ET.fromstring(template)
+
+# Indentation between tags is dropped once at import: Live ignores it, and
+# it would otherwise be parsed, cloned and written for every conversion
+_DRUMCELL_TEMPLATE_BYTES = re.sub(r'>\s+<', '><', _DRUMCELL_TEMPLATE_XML).encode('utf-8')
+_DRUMCELL_TEMPLATE = ET.fromstring(_DRUMCELL_TEMPLATE_BYTES, _PARSER)
+
+
+def create_drumcell_template():
+    """Create a basic DrumCell XML structure with default values"""
+    # With the indentation stripped there are no text nodes to copy, so
+    # copying the cached tree beats re-parsing it on both backends
+    return copy.deepcopy(_DRUMCELL_TEMPLATE)
+
+
+# Simpler sections the mappings read from. Each occurs once per Simpler, so
+# one walk collecting them replaces a './/' descent per mapped parameter.
+_SIMPLER_SECTIONS = frozenset((
+    'MultiSamplePart', 'Pitch', 'VolumeAndPan', 'LoopModulators', 'Globals', 'Filter',
+))
+
+
+def index_simpler_sections(simpler_root):
+    """Collect the Simpler sections used by the mappings in a single tree walk"""
+    if _PARSER is not None:
+        # lxml filters the tags in C
+        elements = simpler_root.iter(*_SIMPLER_SECTIONS)
+    else:
+        elements = (elem for elem in simpler_root.iter() if elem.tag in _SIMPLER_SECTIONS)
+
+    sections = {}
+    for elem in elements:
+        sections.setdefault(elem.tag, []).append(elem)
+    return sections
+
+
+def find_in_section(sections, section, path):
+    """Find path under the first matching section, like root.find('.//section/path')"""
+    for section_elem in sections.get(section, ()):
+        elem = section_elem.find(path)
+        if elem is not None:
+            return elem
+    return None
 
 
 def copy_element_attributes(source, target):
     """Copy all attributes from source element to target element"""
-    for key, value in source.attrib.items():
-        target.set(key, value)
+    # One bulk update instead of a set() call per attribute
+    target.attrib.update(source.attrib)
 
 
-def copy_sample_reference(simpler_root, drumcell_root):
+def copy_sample_reference(simpler_sections, drumcell_root):
     """Copy sample reference from Simpler to DrumCell"""
     # Find first MultiSamplePart (or the selected one)
-    sample_parts = simpler_root.findall('.//MultiSamplePart')
+    sample_parts = simpler_sections.get('MultiSamplePart', [])
     if not sample_parts:
-        print("Warning: No MultiSamplePart found in Simpler")
+        log.warning("No MultiSamplePart found in Simpler")
         return
 
     # Use the first one (or find the one with Selection="true")
@@ -635,35 +706,29 @@ def copy_sample_reference(simpler_root, drumcell_root):
     # Extract sample reference info
     simpler_ref = simpler_part.find('SampleRef')
     if simpler_ref is None:
-        print("Warning: No SampleRef found in MultiSamplePart")
+        log.warning("No SampleRef found in MultiSamplePart")
         return
 
     # Find DrumCell sample reference
-    drumcell_ref = drumcell_root.find('.//UserSample/Value/SampleRef')
+    drumcell_ref = drumcell_root.find('DrumCell/UserSample/Value/SampleRef')
     if drumcell_ref is None:
-        print("Error: Could not find DrumCell SampleRef")
+        log.error("Could not find DrumCell SampleRef")
         return
 
     # Copy FileRef
+    path_val, ne = '', None
     simpler_file_ref = simpler_ref.find('FileRef')
     drumcell_file_ref = drumcell_ref.find('FileRef')
     if simpler_file_ref is not None and drumcell_file_ref is not None:
         # Check if sample exists - can be in Path OR RelativePath/Name format
-        path_elem = simpler_file_ref.find('Path')
-        name_elem = simpler_file_ref.find('Name')
-        has_relative_elem = simpler_file_ref.find('HasRelativePath')
-
-        # Check for absolute path
-        has_absolute_path = path_elem is not None and path_elem.get('Value', '')
+        # Each child is looked up once and its Value read once
+        path_val = pe.get('Value', '') if (pe := simpler_file_ref.find('Path')) is not None else ''
+        name_val = ne.get('Value', '') if (ne := simpler_file_ref.find('Name')) is not None else ''
+        has_rel = (he := simpler_file_ref.find('HasRelativePath')) is not None and he.get('Value') == 'true'
 
-        # Check for relative path (RelativePath elements + Name)
-        has_relative_path = (has_relative_elem is not None and
-                            has_relative_elem.get('Value') == 'true' and
-                            name_elem is not None and
-                            name_elem.get('Value', '') != '')
-
-        if not has_absolute_path and not has_relative_path:
-            print("⚠️  Empty pad (no sample path) - skipping")
+        # Absolute path, or relative path (RelativePath elements + Name)
+        if not path_val and not (has_rel and name_val):
+            log.info("⚠️  Empty pad (no sample path) - skipping")
             return False
 
         for child in simpler_file_ref:
@@ -680,171 +745,257 @@ def copy_sample_reference(simpler_root, drumcell_root):
 
     # Print sample name (from Path or Name element)
     sample_name = "unknown"
-    if path_elem is not None and path_elem.get('Value', ''):
-        from pathlib import Path
-        sample_name = Path(path_elem.get('Value')).name
-    elif name_elem is not None:
-        sample_name = name_elem.get('Value', 'unknown')
+    if path_val:
+        # Plain string split; the name is only used for the log line
+        sample_name = path_val.rpartition('/')[2].rpartition('\\')[2] or path_val
+    elif ne is not None:
+        sample_name = ne.get('Value', 'unknown')
 
-    print(f"✓ Copied sample: {sample_name}")
+    log.info("✓ Copied sample: %s", sample_name)
     return True
 
 
-def map_parameter(simpler_root, drumcell_root, simpler_path, drumcell_path, scale_fn=None):
+def map_parameter(simpler_sections, drumcell_root, simpler_path, drumcell_path, scale_fn=None):
     """Map a parameter from Simpler to DrumCell with optional scaling"""
-    simpler_elem = simpler_root.find(simpler_path)
+    simpler_elem = find_in_section(simpler_sections, *simpler_path)
     drumcell_elem = drumcell_root.find(drumcell_path)
 
     if simpler_elem is not None and drumcell_elem is not None:
         # Try both 'Manual' and 'Value' attributes (Simpler uses 'Value')
         value = simpler_elem.get('Manual') or simpler_elem.get('Value')
         if value is not None:
+            # Only scaled values go through float; the rest are copied as the original string
             if scale_fn:
                 value = str(scale_fn(float(value)))
             # DrumCell stores values in the 'Value' attribute of the <Manual> element
-            drumcell_elem.set('Value', str(value))
+            drumcell_elem.set('Value', value)
             return True
     return False
 
 
-def map_basic_parameters(simpler_root, drumcell_root):
+def _cents_to_semitones(cents):
+    """Convert Simpler's fine tune (cents) to DrumCell's detune (semitones)"""
+    return cents / 100.0
+
+
+# ((simpler_section, path), drumcell_path, scale_function)
+# DrumCell paths are anchored at the template's DrumCell element, so
+# each lookup checks its children rather than scanning the whole tree
+_MAPPINGS = (
+    (('Pitch', 'TransposeKey/Manual'), 'DrumCell/Voice_Transpose/Manual', None),
+    (('Pitch', 'TransposeFine/Manual'), 'DrumCell/Voice_Detune/Manual', _cents_to_semitones),
+    (('VolumeAndPan', 'Volume/Manual'), 'DrumCell/Volume/Manual', None),
+    (('VolumeAndPan', 'Panorama/Manual'), 'DrumCell/Pan/Manual', None),
+    (('VolumeAndPan', 'VolumeVelScale/Manual'), 'DrumCell/Voice_VelocityToVolume/Manual', None),
+    (('LoopModulators', 'SampleStart/Manual'), 'DrumCell/Voice_PlaybackStart/Manual', None),
+    (('LoopModulators', 'SampleLength/Manual'), 'DrumCell/Voice_PlaybackLength/Manual', None),
+)
+
+
+def map_basic_parameters(simpler_sections, drumcell_root):
     """Map basic parameters from Simpler to DrumCell"""
-    mappings = [
-        # (simpler_path, drumcell_path, scale_function)
-        ('.//Pitch/TransposeKey/Manual', './/Voice_Transpose/Manual', None),
-        ('.//Pitch/TransposeFine/Manual', './/Voice_Detune/Manual', lambda x: x / 100.0),  # Cents to semitones
-        ('.//VolumeAndPan/Volume/Manual', './/Volume/Manual', None),
-        ('.//VolumeAndPan/Panorama/Manual', './/Pan/Manual', None),
-        ('.//VolumeAndPan/VolumeVelScale/Manual', './/Voice_VelocityToVolume/Manual', None),
-        ('.//LoopModulators/SampleStart/Manual', './/Voice_PlaybackStart/Manual', None),
-        ('.//LoopModulators/SampleLength/Manual', './/Voice_PlaybackLength/Manual', None),
-    ]
-
-    print("\n📋 Mapping basic parameters:")
-    for simpler_path, drumcell_path, scale_fn in mappings:
-        if map_parameter(simpler_root, drumcell_root, simpler_path, drumcell_path, scale_fn):
-            param_name = drumcell_path.split('/')[-2]
-            print(f"  ✓ {param_name}")
-
-
-def map_envelope(simpler_root, drumcell_root):
+    log.debug("\n📋 Mapping basic parameters:")
+    for simpler_path, drumcell_path, scale_fn in _MAPPINGS:
+        if map_parameter(simpler_sections, drumcell_root, simpler_path, drumcell_path, scale_fn):
+            log.debug("  ✓ %s", drumcell_path.split('/')[-2])
+
+
+def _clamp_set(elem, value, lo, hi):
+    """Clamp value to [lo, hi], store it as elem's Value and return it"""
+    value = max(lo, min(hi, value))
+    elem.set('Value', str(value))
+    return value
+
+
+def map_envelope(simpler_sections, drumcell_root):
     """Map Simpler's complex envelope to DrumCell's simple AHDM envelope"""
-    print("\n🎚️  Mapping envelope:")
+    log.debug("\n🎚️  Mapping envelope:")
 
     # Simpler uses milliseconds in VolumeAndPan/Envelope
     # DrumCell uses seconds in Voice_Envelope_*
 
-    # Attack: Convert from ms to seconds
-    attack_elem = simpler_root.find('.//VolumeAndPan/Envelope/AttackTime/Manual')
+    # Resolve each DrumCell envelope target once
+    drumcell = drumcell_root.find('DrumCell')
+    env_attack = drumcell.find('Voice_Envelope_Attack/Manual')
+    env_decay = drumcell.find('Voice_Envelope_Decay/Manual')
+    env_hold = drumcell.find('Voice_Envelope_Hold/Manual')
+    env_mode = drumcell.find('Voice_Envelope_Mode/Manual')
+
+    # Attack: Convert from ms to seconds, clamped to DrumCell's range (0.0001 - 20 seconds)
+    attack_elem = find_in_section(simpler_sections, 'VolumeAndPan', 'Envelope/AttackTime/Manual')
     if attack_elem is not None:
         attack_ms = float(attack_elem.get('Value'))
-        attack_sec = attack_ms / 1000.0
-        # Clamp to DrumCell's range (0.0001 - 20 seconds)
-        attack_sec = max(0.0001, min(20.0, attack_sec))
-        drumcell_root.find('.//Voice_Envelope_Attack/Manual').set('Value', str(attack_sec))
-        print(f"  ✓ Attack: {attack_ms}ms → {attack_sec}s")
+        attack_sec = _clamp_set(env_attack, attack_ms / 1000.0, 0.0001, 20.0)
+        log.debug("  ✓ Attack: %sms → %ss", attack_ms, attack_sec)
 
     # Decay: Ableton's logic depends on PlaybackMode
     # PlaybackMode 1 = One-Shot: Uses a default decay of 1 second
     # PlaybackMode 0 = Classic: Uses the ADSR envelope
-    playback_mode_elem = simpler_root.find('.//Globals/PlaybackMode')
-    playback_mode = 0
-    if playback_mode_elem is not None:
-        playback_mode = int(playback_mode_elem.get('Value'))
-
-    if playback_mode == 1:
+    playback_mode_elem = find_in_section(simpler_sections, 'Globals', 'PlaybackMode')
+    if playback_mode_elem is not None and int(playback_mode_elem.get('Value')) == 1:
         # One-Shot mode: Ableton uses default decay of 1 second
         decay_sec = 1.0
-        drumcell_root.find('.//Voice_Envelope_Decay/Manual').set('Value', str(decay_sec))
-        print(f"  ✓ Decay: {decay_sec}s (One-Shot mode default)")
+        env_decay.set('Value', str(decay_sec))
+        log.debug("  ✓ Decay: %ss (One-Shot mode default)", decay_sec)
     else:
-        # Classic mode: Use Simpler's Decay or Release time
-        sustain_elem = simpler_root.find('.//VolumeAndPan/Envelope/SustainLevel/Manual')
-        release_elem = simpler_root.find('.//VolumeAndPan/Envelope/ReleaseTime/Manual')
-        decay_elem = simpler_root.find('.//VolumeAndPan/Envelope/DecayTime/Manual')
+        # Classic mode: Use Simpler's Decay or Release time, clamped to
+        # DrumCell's range (0.001 - 60 seconds)
+        sustain_elem = find_in_section(simpler_sections, 'VolumeAndPan', 'Envelope/SustainLevel/Manual')
+        sustain_level = float(sustain_elem.get('Value')) if sustain_elem is not None else 1.0
 
-        sustain_level = 1.0
-        if sustain_elem is not None:
-            sustain_level = float(sustain_elem.get('Value'))
-
-        # If sustain is at max, use release time as decay
-        if release_elem is not None and sustain_level >= 0.99:
+        # Common case first: with sustain below max the DecayTime is used,
+        # so ReleaseTime is only looked up when sustain is at max
+        if sustain_level < 0.99 or (release_elem := find_in_section(
+                simpler_sections, 'VolumeAndPan', 'Envelope/ReleaseTime/Manual')) is None:
+            decay_elem = find_in_section(simpler_sections, 'VolumeAndPan', 'Envelope/DecayTime/Manual')
+            if decay_elem is not None:
+                decay_ms = float(decay_elem.get('Value'))
+                decay_sec = _clamp_set(env_decay, decay_ms / 1000.0, 0.001, 60.0)
+                log.debug("  ✓ Decay: %sms → %ss", decay_ms, decay_sec)
+        else:
+            # Sustain is at max: use release time as decay
             release_ms = float(release_elem.get('Value'))
-            decay_sec = release_ms / 1000.0
-            # Clamp to DrumCell's range (0.001 - 60 seconds)
-            decay_sec = max(0.001, min(60.0, decay_sec))
-            drumcell_root.find('.//Voice_Envelope_Decay/Manual').set('Value', str(decay_sec))
-            print(f"  ✓ Decay: {release_ms}ms (from Release) → {decay_sec}s")
-        elif decay_elem is not None:
-            decay_ms = float(decay_elem.get('Value'))
-            decay_sec = decay_ms / 1000.0
-            # Clamp to DrumCell's range (0.001 - 60 seconds)
-            decay_sec = max(0.001, min(60.0, decay_sec))
-            drumcell_root.find('.//Voice_Envelope_Decay/Manual').set('Value', str(decay_sec))
-            print(f"  ✓ Decay: {decay_ms}ms → {decay_sec}s")
+            decay_sec = _clamp_set(env_decay, release_ms / 1000.0, 0.001, 60.0)
+            log.debug("  ✓ Decay: %sms (from Release) → %ss", release_ms, decay_sec)
 
     # Hold: Use Ableton's exact value
     hold_sec = 0.3000001013  # Matches Ableton's default
-    drumcell_root.find('.//Voice_Envelope_Hold/Manual').set('Value', str(hold_sec))
-    print(f"  ✓ Hold: {hold_sec}s")
+    env_hold.set('Value', str(hold_sec))
+    log.debug("  ✓ Hold: %ss", hold_sec)
 
     # Mode: 0 = Trigger, 1 = Gate
     # Ableton uses Trigger (0) mode - the sound decays naturally
     mode = 0
-    drumcell_root.find('.//Voice_Envelope_Mode/Manual').set('Value', str(mode))
+    env_mode.set('Value', str(mode))
     mode_name = "Trigger"
-    print(f"  ✓ Mode: {mode_name}")
+    log.debug("  ✓ Mode: %s", mode_name)
 
 
-def map_filter(simpler_root, drumcell_root):
+def map_filter(simpler_sections, drumcell_root):
     """Map filter settings if Simpler's filter is enabled"""
     # Note: Simpler's filter is in a Slot, which can contain various filter devices
     # DrumCell has a simple built-in filter
     # Ableton keeps filter on by default even if Simpler's filter is off
 
-    filter_on = simpler_root.find('.//Filter/IsOn/Manual')
+    filter_on = find_in_section(simpler_sections, 'Filter', 'IsOn/Manual')
     if filter_on is not None and filter_on.get('Value') == 'true':
-        print("\n🔊 Filter: ON (with DrumCell defaults)")
+        log.debug("\n🔊 Filter: ON (with DrumCell defaults)")
         # DrumCell filter is already on in the template
     else:
-        print("\n🔊 Filter: ON (DrumCell default, fully open)")
+        log.debug("\n🔊 Filter: ON (DrumCell default, fully open)")
         # Keep filter on, it's fully open by default (frequency at max)
 
 
-def simpler_to_drumcell(simpler_xml):
-    """Convert Simpler XML to DrumCell XML. Returns None if conversion should be skipped."""
-    print("\n" + "="*60)
-    print("🔄 Converting Simpler → DrumCell")
-    print("="*60)
+def _convert_simpler_element(simpler_elem):
+    """Map a Simpler element onto a new DrumCell template. Returns the template root, or None if skipped."""
+    log.info("\n%s\n🔄 Converting Simpler → DrumCell\n%s", _RULE, _RULE)
 
-    simpler_root = ET.fromstring(simpler_xml)
     drumcell_root = create_drumcell_template()
+    simpler_sections = index_simpler_sections(simpler_elem)
 
     # Perform mappings
-    sample_copied = copy_sample_reference(simpler_root, drumcell_root)
+    sample_copied = copy_sample_reference(simpler_sections, drumcell_root)
 
     # If sample copy failed (empty pad), skip this conversion
     if sample_copied is False:
         return None
 
-    map_basic_parameters(simpler_root, drumcell_root)
-    map_envelope(simpler_root, drumcell_root)
-    map_filter(simpler_root, drumcell_root)
+    map_basic_parameters(simpler_sections, drumcell_root)
+    map_envelope(simpler_sections, drumcell_root)
+    map_filter(simpler_sections, drumcell_root)
+
+    log.info("\n%s\n✅ Conversion complete\n%s\n", _RULE, _RULE)
+
+    return drumcell_root
+
+
+def _simpler_element_to_drumcell_element(simpler_elem):
+    """Convert an OriginalSimpler element to a DrumCell element. Returns None if conversion should be skipped."""
+    drumcell_root = _convert_simpler_element(simpler_elem)
+    if drumcell_root is None:
+        return None
+    return drumcell_root.find('DrumCell')
+
 
-    print("\n" + "="*60)
-    print("✅ Conversion complete")
-    print("="*60 + "\n")
+# Any non-empty Path or relative reference means the pad may hold a sample
+_SAMPLE_HINT_RE = re.compile(rb'<Path Value="[^"]|<HasRelativePath Value="true"')
 
-    return ET.tostring(drumcell_root, encoding='unicode', xml_declaration=True)
+
+def _is_empty_pad_xml(xml_bytes):
+    """Byte-level check for a Simpler that copy_sample_reference would skip as an empty pad.
+
+    Only answers True for a single MultiSamplePart holding a SampleRef/FileRef
+    with no sample path anywhere in the document; anything else is left to
+    the full parse.
+    """
+    part = xml_bytes.find(b'<MultiSamplePart ')
+    if part < 0 or xml_bytes.find(b'<MultiSamplePart ', part + 1) >= 0:
+        return False
+    ref = xml_bytes.find(b'<SampleRef>', part)
+    end = xml_bytes.find(b'</MultiSamplePart>', part)
+    if not part < ref < end or xml_bytes.find(b'<FileRef>', ref, end) < 0:
+        return False
+    return _SAMPLE_HINT_RE.search(xml_bytes) is None
+
+
+def simpler_to_drumcell(simpler_xml):
+    """Convert Simpler XML (str or bytes) to UTF-8 DrumCell XML bytes. Returns None if conversion should be skipped."""
+    if isinstance(simpler_xml, str):
+        simpler_xml = simpler_xml.encode('utf-8')
+
+    # Empty pads are common in kit templates; skip them without parsing
+    if _is_empty_pad_xml(simpler_xml):
+        log.info("⚠️  Empty pad (no sample path) - skipping")
+        return None
+
+    simpler_root = ET.fromstring(simpler_xml, _PARSER)
+
+    drumcell_root = _convert_simpler_element(simpler_root)
+    if drumcell_root is None:
+        return None
+
+    # Bytes are what encode_adg writes, so skip the decode/re-encode round-trip.
+    # The declaration is fixed, so it is prepended rather than generated
+    return _XML_HEADER + ET.tostring(drumcell_root, encoding='utf-8', xml_declaration=False)
+
+
+def convert_file(input_path, output_path):
+    """Convert one Simpler .adv file to a DrumCell .adv file. Returns False if the pad is empty."""
+    drumcell_xml = simpler_to_drumcell(decode_adg_bytes(Path(input_path)))
+    if drumcell_xml is None:
+        return False
+    encode_adg(drumcell_xml, Path(output_path))
+    return True
+
+
+def batch_convert(pairs, workers=None):
+    """
+    Convert many (input_path, output_path) Simpler files across worker processes
+
+    Each conversion is independent and CPU-bound, so it scales with cores; every
+    worker parses the DrumCell template once at import and reuses it.
+
+    Returns a list with convert_file's result for each pair, in order.
+    """
+    if not pairs:
+        return []
+    input_paths, output_paths = zip(*pairs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(convert_file, input_paths, output_paths, chunksize=4))
 
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: simpler_to_drumcell.py <input_simpler.adv> <output_drumcell.adv>")
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    profile = len(args) != len(sys.argv) - 1
+
+    if len(args) != 2:
+        print("Usage: simpler_to_drumcell.py <input_simpler.adv> <output_drumcell.adv> [--profile]")
         sys.exit(1)
 
-    input_path = Path(sys.argv[1])
-    output_path = Path(sys.argv[2])
+    input_path = Path(args[0])
+    output_path = Path(args[1])
 
     if not input_path.exists():
         print(f"Error: Input file not found: {input_path}")
@@ -852,10 +1003,15 @@ def main():
 
     # Decode Simpler
     print(f"📖 Reading: {input_path.name}")
-    simpler_xml = decode_adg(input_path)
+    simpler_xml = decode_adg_bytes(input_path)
 
     # Convert
-    drumcell_xml = simpler_to_drumcell(simpler_xml)
+    if profile:
+        profiler = cProfile.Profile()
+        drumcell_xml = profiler.runcall(simpler_to_drumcell, simpler_xml)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(20)
+    else:
+        drumcell_xml = simpler_to_drumcell(simpler_xml)
 
     # Encode DrumCell
     print(f"💾 Writing: {output_path.name}")
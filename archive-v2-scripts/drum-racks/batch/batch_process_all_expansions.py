@@ -6,15 +6,25 @@ Processes all Native Instruments Expansion libraries to create suffix-based dual
 """
 
 import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import List
 import subprocess
 import time
 
-def process_expansion(script_path: Path, template_path: Path, expansion_path: Path, output_base: Path) -> dict:
+# Add the scripts root to the path for the shared utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.process_runner import run_streamed
+
+def process_expansion(base_cmd: List[str], expansion_path: Path, output_base: Path) -> dict:
     """
     Process a single expansion library.
     
+    base_cmd is the interpreter, generator script and template, validated and
+    resolved once in main.
+    
     Returns:
         dict with results: {'name': str, 'success': bool, 'dual_kits': int, 'error': str}
     """
@@ -37,17 +47,17 @@ def process_expansion(script_path: Path, template_path: Path, expansion_path: Pa
     
     try:
         # Run the suffix-based kit generator
-        cmd = [
-            'python3', str(script_path),
-            str(template_path),
+        cmd = base_cmd + [
             str(expansion_path),
             '--output-folder', str(output_folder),
             '--dual'
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)  # 5 minute timeout
+        # Stream the generator's output, tagged with the expansion since
+        # several expansions run at once (5 minute timeout)
+        returncode, stderr = run_streamed(cmd, prefix=f"[{expansion_name}] ", timeout=300)
         
-        if result.returncode == 0:
+        if returncode == 0:
             # Count generated files
             if output_folder.exists():
                 dual_kits = len(list(output_folder.glob("*.adg")))
@@ -69,7 +79,7 @@ def process_expansion(script_path: Path, template_path: Path, expansion_path: Pa
                 'name': expansion_name,
                 'success': False,
                 'dual_kits': 0,
-                'error': f"Script failed: {result.stderr.strip()}"
+                'error': f"Script failed: {stderr.strip()}"
             }
             
     except subprocess.TimeoutExpired:
@@ -100,6 +110,8 @@ def main():
                        help='Limit number of expansions to process (for testing)')
     parser.add_argument('--skip-existing', action='store_true',
                        help='Skip expansions that already have output folders')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Number of expansions processed concurrently (default: CPU count)')
     
     args = parser.parse_args()
     
@@ -124,6 +136,9 @@ def main():
     # Create output root
     output_root.mkdir(parents=True, exist_ok=True)
     
+    # Resolve the shared part of every generator command once, after validation
+    base_cmd = [sys.executable, str(script_path.resolve()), str(template_path.resolve())]
+    
     # Get all expansion folders
     expansions = [p for p in expansions_root.iterdir() if p.is_dir()]
     expansions.sort()
@@ -140,24 +155,41 @@ def main():
     results = []
     start_time = time.time()
     
+    # One listing of the output root replaces a stat per expansion, which
+    # matters when it lives on a network share
+    existing = set(os.listdir(output_root)) if args.skip_existing else set()
+    
+    pending = []
     for i, expansion_path in enumerate(expansions, 1):
         expansion_name = expansion_path.name
-        output_folder = output_root / f"{expansion_name} Dual Kits"
         
         # Skip if output already exists and --skip-existing is set
-        if args.skip_existing and output_folder.exists():
+        if f"{expansion_name} Dual Kits" in existing:
             print(f"\n[{i}/{len(expansions)}] Skipping {expansion_name} (already exists)")
             continue
         
-        print(f"\n[{i}/{len(expansions)}] Processing {expansion_name}...")
-        
-        result = process_expansion(script_path, template_path, expansion_path, output_root)
-        results.append(result)
+        pending.append(expansion_path)
+    
+    # Each expansion is an independent generator process; threads only wait
+    # on them, so several expansions run at once across cores
+    workers = args.workers or min(len(pending), os.cpu_count() or 1) or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process_expansion, base_cmd, expansion_path, output_root)
+            for expansion_path in pending
+        ]
         
-        if result['success']:
-            print(f"✓ Success: {result['dual_kits']} dual kits created")
-        else:
-            print(f"✗ Failed: {result['error']}")
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            
+            if result['success']:
+                print(f"[{done}/{len(pending)}] ✓ {result['name']}: {result['dual_kits']} dual kits created")
+            else:
+                print(f"[{done}/{len(pending)}] ✗ {result['name']}: {result['error']}")
+    
+    # Report in library order regardless of completion order
+    results.sort(key=lambda r: r['name'])
     
     # Print summary
     elapsed = time.time() - start_time
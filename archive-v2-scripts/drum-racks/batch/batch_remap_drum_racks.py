@@ -10,56 +10,54 @@ Usage:
 """
 
 import argparse
+import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Tuple
-import xml.etree.ElementTree as ET
 
 # Add parent directories to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.decoder import decode_adg
+from utils.decoder import decode_adg_bytes
 from utils.encoder import encode_adg
+from utils.batch_files import PROGRESS_INTERVAL, iter_adg_files
 
+# Patterns are bytes: the tags are ASCII, so the rack is edited without
+# building a tree. A pad's note is the first child of its own ZoneSettings.
+_RE_NOTE = re.compile(rb'(<ZoneSettings>\s*<ReceivingNote Value=")(\d+)(")')
+_RE_SCROLL = re.compile(rb'(<PadScrollPosition Value=")(\d+)(")')
 
-def remap_midi_notes(xml_content: str, shift: int, scroll_shift: int = 0) -> str:
+
+def _shift_value(shift: int):
+    """Build a substitution callback that adds shift to the matched value, clamped to 0-127."""
+    def replace(match):
+        value = max(0, min(127, int(match.group(2)) + shift))
+        return match.group(1) + str(value).encode() + match.group(3)
+    return replace
+
+
+def remap_midi_notes(xml_content: bytes, shift: int, scroll_shift: int = 0) -> bytes:
     """
     Shift all MIDI notes in a drum rack by a specified amount.
 
     Args:
-        xml_content: XML content string
+        xml_content: XML content as UTF-8 bytes
         shift: Amount to shift MIDI notes
         scroll_shift: Amount to shift the pad scroll position
 
     Returns:
-        Modified XML content
+        Modified XML content as UTF-8 bytes
     """
-    root = ET.fromstring(xml_content)
-
-    # Find all drum pads
-    drum_pads = root.findall('.//DrumBranchPreset')
-
-    # Shift MIDI notes for each pad
-    for pad in drum_pads:
-        zone_settings = pad.find('.//ZoneSettings/ReceivingNote')
-        if zone_settings is not None:
-            old_note = int(zone_settings.get('Value'))
-            new_note = old_note + shift
+    # Shift the MIDI note of every pad, clamped to the valid MIDI range (0-127)
+    xml_content = _RE_NOTE.sub(_shift_value(shift), xml_content)
 
-            # Clamp to valid MIDI range (0-127)
-            new_note = max(0, min(127, new_note))
-            zone_settings.set('Value', str(new_note))
-
-    # Shift the pad scroll position if requested
+    # Shift the (first) pad scroll position if requested
     if scroll_shift != 0:
-        scroll_elem = root.find('.//PadScrollPosition')
-        if scroll_elem is not None:
-            old_scroll = int(scroll_elem.get('Value'))
-            new_scroll = old_scroll + scroll_shift
-            new_scroll = max(0, min(127, new_scroll))
-            scroll_elem.set('Value', str(new_scroll))
+        xml_content = _RE_SCROLL.sub(_shift_value(scroll_shift), xml_content, count=1)
 
-    return ET.tostring(root, encoding='unicode', xml_declaration=True)
+    return xml_content
 
 
 def process_rack(
@@ -71,19 +69,18 @@ def process_rack(
     """
     Process a single drum rack file.
 
+    The output directory must already exist; main() creates them all up front.
+
     Returns:
         (success, error_message)
     """
     try:
         # Decode the ADG file
-        xml_content = decode_adg(input_path)
+        xml_content = decode_adg_bytes(input_path)
 
         # Remap the MIDI notes
         transformed_xml = remap_midi_notes(xml_content, shift, scroll_shift)
 
-        # Create output directory if needed
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
         # Encode back to ADG
         encode_adg(transformed_xml, output_path)
 
@@ -93,6 +90,11 @@ def process_rack(
         return False, str(e)
 
 
+def _remap_one(job: Tuple[str, str, int, int]) -> Tuple[bool, str]:
+    """Worker entry point: process one (input_path, output_path, shift, scroll_shift) job."""
+    return process_rack(*job)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Batch remap MIDI notes in drum racks',
@@ -132,6 +134,17 @@ Examples:
         action='store_true',
         help='Preview files that would be processed without actually processing them'
     )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print a line for every file instead of periodic progress'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes (default: CPU count)'
+    )
     parser.add_argument(
         '--yes', '-y',
         action='store_true',
@@ -150,7 +163,7 @@ Examples:
         sys.exit(1)
 
     # Find all .adg files
-    adg_files = list(args.input_folder.rglob("*.adg"))
+    adg_files = sorted(iter_adg_files(args.input_folder))
 
     if not adg_files:
         print(f"✗ Error: No .adg files found in {args.input_folder}", file=sys.stderr)
@@ -186,34 +199,53 @@ Examples:
     error_count = 0
     errors = []
 
-    for i, input_path in enumerate(adg_files, 1):
-        # Calculate relative path to preserve folder structure
-        rel_path = input_path.relative_to(args.input_folder)
-        output_path = args.output_folder / rel_path
-
-        # Show progress
-        print(f"[{i}/{len(adg_files)}] {rel_path}")
-
-        if args.dry_run:
-            print(f"  → Would create: {output_path}")
-            success_count += 1
-            continue
-
-        # Process the rack
-        success, error = process_rack(
-            input_path,
-            output_path,
-            args.shift,
-            args.scroll_shift
-        )
-
-        if success:
-            print(f"  ✓ Created: {output_path}")
-            success_count += 1
-        else:
-            print(f"  ✗ Error: {error}")
-            error_count += 1
-            errors.append((rel_path, error))
+    # Calculate relative paths up front to preserve folder structure. The
+    # walk yields strings under input_folder, so plain slicing and joining
+    # stand in for per-file Path arithmetic.
+    prefix_len = len(os.path.join(str(args.input_folder), ''))
+    output_root = str(args.output_folder)
+    rel_paths = [input_path[prefix_len:] for input_path in adg_files]
+    jobs = [
+        (input_path, os.path.join(output_root, rel_path), args.shift, args.scroll_shift)
+        for input_path, rel_path in zip(adg_files, rel_paths)
+    ]
+
+    # Create each output directory once, instead of once per file in the workers
+    if not args.dry_run:
+        for output_dir in {os.path.dirname(output_path) for _, output_path, _, _ in jobs}:
+            os.makedirs(output_dir, exist_ok=True)
+
+    if args.dry_run:
+        # Nothing is written, so list the planned files without starting workers
+        for i, (rel_path, job) in enumerate(zip(rel_paths, jobs), 1):
+            print(f"[{i}/{len(adg_files)}] {rel_path}")
+            print(f"  → Would create: {job[1]}")
+        success_count = len(jobs)
+    else:
+        # Files are independent, so decode/remap/encode runs in worker processes;
+        # results come back in submission order and progress is printed here
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            results = executor.map(_remap_one, jobs, chunksize=16)
+
+            for i, (rel_path, job, (success, error)) in enumerate(zip(rel_paths, jobs, results), 1):
+                output_path = job[1]
+
+                if success:
+                    success_count += 1
+                else:
+                    error_count += 1
+                    errors.append((rel_path, error))
+
+                # Per-file lines with --verbose; otherwise a progress line
+                # every PROGRESS_INTERVAL files, with failures in the summary
+                if args.verbose:
+                    print(f"[{i}/{len(adg_files)}] {rel_path}")
+                    if success:
+                        print(f"  ✓ Created: {output_path}")
+                    else:
+                        print(f"  ✗ Error: {error}")
+                elif i % PROGRESS_INTERVAL == 0 or i == len(adg_files):
+                    print(f"[{i}/{len(adg_files)}] {success_count} created, {error_count} errors")
 
     # Summary
     print(f"\n{'='*80}")
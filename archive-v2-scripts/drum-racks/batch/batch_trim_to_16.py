@@ -11,20 +11,99 @@ Usage:
 """
 
 import argparse
+import errno
+import os
+import re
+import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional, Tuple
 
 # Add parent directories to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from drum_rack.trim_drum_racks_to_16 import trim_drum_racks_to_16
+from utils.decoder import decode_adg_bytes
+from utils.batch_files import PROGRESS_INTERVAL, iter_adg_files
+
+# Rack preset and drum device tags, for counting drum racks without parsing
+_RACK_TAG_RE = re.compile(rb'<(/?)(GroupDevicePreset|DrumGroupDevice)[\s>/]')
+
+
+def _count_untrimmed_racks(input_path: Path) -> Optional[int]:
+    """
+    Cheap pre-check on the decoded bytes, skipping the XML parse.
+
+    A file with at most 16 drum pads in total cannot have a rack to trim.
+
+    Returns:
+        The number of drum racks trim_drum_racks_to_16 would report as
+        unchanged, or None if the file may need trimming
+    """
+    xml = decode_adg_bytes(input_path)
+    if xml.count(b'<DrumBranchPreset ') + xml.count(b'<DrumBranchPreset>') > 16:
+        return None
+
+    # Like find_drum_rack_presets: every GroupDevicePreset with a
+    # DrumGroupDevice anywhere inside it counts as a drum rack
+    racks = 0
+    open_presets = []  # per open GroupDevicePreset: has a DrumGroupDevice inside
+    for match in _RACK_TAG_RE.finditer(xml):
+        closing, tag = match.groups()
+        if tag == b'GroupDevicePreset':
+            if closing:
+                racks += open_presets.pop()
+            else:
+                open_presets.append(False)
+        elif not closing:
+            open_presets = [True] * len(open_presets)
+    return racks
+
+
+def _link_unchanged(input_path: Path, output_path: Path) -> None:
+    """Hard-link an unchanged rack into the output tree, copying across devices."""
+    if os.path.lexists(output_path):
+        os.remove(output_path)
+    try:
+        os.link(input_path, output_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.copy2(input_path, output_path)
+
+
+def _trim_one(job: Tuple[Path, Path, bool, bool]) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Worker entry point: trim one (input_path, output_path, dry_run, link_unchanged) job.
+
+    Returns:
+        (stats, error_message) - stats is None when the file failed
+    """
+    input_path, output_path, dry_run, link_unchanged = job
+    try:
+        racks = _count_untrimmed_racks(input_path)
+        if racks is None:
+            # Trim the rack (quiet mode for batch processing)
+            stats = trim_drum_racks_to_16(input_path, output_path, dry_run, quiet=True)
+        else:
+            stats = {'racks_found': racks, 'racks_trimmed': 0, 'total_pads_removed': 0, 'racks_unchanged': racks}
+
+        if link_unchanged and not dry_run and stats['racks_trimmed'] == 0 and output_path != input_path:
+            _link_unchanged(input_path, output_path)
+        return stats, None
+    except Exception as e:
+        return None, str(e)
 
 
 def batch_trim_to_16(
     input_dir: Path,
     output_dir: Path,
     dry_run: bool = False,
-    in_place: bool = False
+    in_place: bool = False,
+    workers: Optional[int] = None,
+    link_unchanged: bool = False,
+    verbose: bool = False
 ) -> dict:
     """
     Process all .adg files recursively, trimming drum racks to 16 pads.
@@ -34,6 +113,10 @@ def batch_trim_to_16(
         output_dir: Output directory (preserves subdirectory structure)
         dry_run: If True, analyze only without modifying
         in_place: If True, overwrite original files (ignores output_dir)
+        workers: Number of worker processes (default: CPU count)
+        link_unchanged: If True, hard-link racks that need no trim into
+            output_dir (they are otherwise not written)
+        verbose: If True, report every file instead of periodic progress
 
     Returns:
         Statistics dictionary
@@ -45,7 +128,7 @@ def batch_trim_to_16(
         raise ValueError(f"Input path is not a directory: {input_dir}")
 
     # Find all .adg files recursively
-    adg_files = sorted(input_dir.rglob('*.adg'))
+    adg_files = sorted(iter_adg_files(input_dir))
 
     if len(adg_files) == 0:
         print(f"⚠️  No .adg files found in {input_dir}")
@@ -73,6 +156,8 @@ def batch_trim_to_16(
         output_dir.mkdir(parents=True, exist_ok=True)
 
     # Process files
+    ensured_dirs = set()
+    errors = []
     global_stats = {
         'processed': 0,
         'skipped': 0,
@@ -82,43 +167,63 @@ def batch_trim_to_16(
         'racks_unchanged': 0
     }
 
-    for idx, input_path in enumerate(adg_files):
+    # Build every job first so output directories are created once, here
+    rel_paths = []
+    jobs = []
+    for input_file in adg_files:
         # Compute relative path to preserve directory structure
-        rel_path = input_path.relative_to(input_dir)
+        input_path = Path(input_file)
+        rel_path = os.path.relpath(input_file, input_dir)
 
         if in_place:
             output_path = input_path
         else:
             output_path = output_dir / rel_path
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        print(f"[{idx+1}/{len(adg_files)}] {rel_path}")
-
-        try:
-            # Trim the rack (quiet mode for batch processing)
-            stats = trim_drum_racks_to_16(
-                input_path,
-                output_path,
-                dry_run,
-                quiet=True
-            )
-
-            if stats['racks_trimmed'] > 0:
-                print(f"  ✓ Trimmed {stats['racks_trimmed']} rack(s), removed {stats['total_pads_removed']} pad(s)")
-                global_stats['processed'] += 1
-                global_stats['racks_trimmed'] += stats['racks_trimmed']
-                global_stats['total_pads_removed'] += stats['total_pads_removed']
+            # Sibling files share a parent; only the first one needs the mkdir
+            if output_path.parent not in ensured_dirs:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                ensured_dirs.add(output_path.parent)
+
+        rel_paths.append(rel_path)
+        jobs.append((input_path, output_path, dry_run, link_unchanged))
+
+    # Each file is trimmed independently (in place, each worker writes only
+    # its own file), so the decode/trim/encode work is spread over processes.
+    # Results come back in order and are reported here.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_trim_one, jobs, chunksize=8)
+
+        for idx, (rel_path, (stats, error)) in enumerate(zip(rel_paths, results)):
+            # Per-file lines for dry runs and verbose mode; otherwise a progress
+            # line every PROGRESS_INTERVAL files, with failures in the summary
+            show = dry_run or verbose
+            if show:
+                print(f"[{idx+1}/{len(adg_files)}] {rel_path}")
+
+            if error is not None:
+                if show:
+                    print(f"  ✗ Error: {error}\n")
+                global_stats['errors'] += 1
+                errors.append((rel_path, error))
             else:
-                print(f"  - No changes needed")
-                global_stats['skipped'] += 1
-
-            global_stats['racks_unchanged'] += stats['racks_unchanged']
-            print()
-
-        except Exception as e:
-            print(f"  ✗ Error: {e}\n")
-            global_stats['errors'] += 1
-            continue
+                if stats['racks_trimmed'] > 0:
+                    if show:
+                        print(f"  ✓ Trimmed {stats['racks_trimmed']} rack(s), removed {stats['total_pads_removed']} pad(s)")
+                    global_stats['processed'] += 1
+                    global_stats['racks_trimmed'] += stats['racks_trimmed']
+                    global_stats['total_pads_removed'] += stats['total_pads_removed']
+                else:
+                    if show:
+                        print(f"  - No changes needed")
+                    global_stats['skipped'] += 1
+
+                global_stats['racks_unchanged'] += stats['racks_unchanged']
+                if show:
+                    print()
+
+            if not show and ((idx + 1) % PROGRESS_INTERVAL == 0 or idx + 1 == len(adg_files)):
+                print(f"[{idx+1}/{len(adg_files)}] {global_stats['processed']} trimmed, "
+                      f"{global_stats['skipped']} unchanged, {global_stats['errors']} errors")
 
     # Print summary
     print(f"\n{'='*70}")
@@ -131,6 +236,12 @@ def batch_trim_to_16(
     print(f"Drum racks unchanged: {global_stats['racks_unchanged']}")
     print(f"Total pads removed:   {global_stats['total_pads_removed']}")
 
+    if errors:
+        print(f"\nFailed files:")
+        for rel_path, error in errors:
+            print(f"  • {rel_path}")
+            print(f"    {error}")
+
     if not dry_run and not in_place and global_stats['processed'] > 0:
         print(f"\nOutput directory: {output_dir}")
 
@@ -165,6 +276,10 @@ Notes:
     parser.add_argument('output_dir', type=Path, help='Output directory')
     parser.add_argument('--dry-run', action='store_true', help='Preview without making changes')
     parser.add_argument('--in-place', action='store_true', help='Modify files in place (CAUTION!)')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--verbose', action='store_true', help='Print a line for every file instead of periodic progress')
+    parser.add_argument('--link-unchanged', action='store_true',
+                        help='Hard-link racks that need no trim into the output (shares data with the input)')
 
     args = parser.parse_args()
 
@@ -173,7 +288,10 @@ Notes:
             args.input_dir,
             args.output_dir,
             args.dry_run,
-            args.in_place
+            args.in_place,
+            args.workers,
+            args.link_unchanged,
+            args.verbose
         )
 
         # Exit with error code if there were errors
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import subprocess
 import sys
-from typing import List
+from typing import List, Optional
+
+# Add the scripts root to the path for the shared utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.process_runner import run_streamed
 
 def find_library_folders(expansions_path: Path) -> List[Path]:
     """Find all library folders in the expansions directory"""
@@ -17,34 +21,28 @@ def find_library_folders(expansions_path: Path) -> List[Path]:
     
     return sorted(libraries)
 
-def process_library(cmd: List[str]) -> None:
-    """Process a single library using main.py"""
-    library_name = Path(cmd[2]).name
-    print(f"\n{'='*80}")
-    print(f"Processing library: {library_name}")
-    print(f"{'='*80}\n")
+def process_library(cmd: List[str]) -> Optional[str]:
+    """Process a single library using main.py; returns a warning if it did not succeed"""
+    library_name = Path(cmd[3]).name  # Library path is the 4th argument
     
     try:
-        # Run main.py for this library
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Print output
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print("Errors:", result.stderr, file=sys.stderr)
+        # Run main.py for this library, forwarding its output as it is produced
+        returncode, _ = run_streamed(cmd, prefix=f"[{library_name}] ")
             
-        if result.returncode != 0:
-            print(f"Warning: Processing {library_name} failed with code {result.returncode}")
+        if returncode != 0:
+            return f"Warning: Processing {library_name} failed with code {returncode}"
             
     except Exception as e:
-        print(f"Error processing {library_name}: {e}")
+        return f"Error processing {library_name}: {e}"
+    return None
 
 def main():
     parser = argparse.ArgumentParser(description='Process multiple Ableton drum racks from expansion libraries')
     parser.add_argument('input_file', type=str, help='Input template .adg file path')
     parser.add_argument('expansions_folder', type=str, 
                        help='Path to Native Instruments Expansions folder')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of libraries processed concurrently (default: 1)')
     
     try:
         args = parser.parse_args()
@@ -72,18 +70,32 @@ def main():
             print(f"- {lib.name}")
         print()
         
-        # Process each library
+        # Build the command for each library
+        # The interpreter, generator and validated input are the same for every command
+        base_cmd = [sys.executable, 'scripts/device/drum_rack/main.py', str(input_path.resolve())]
+        cmds = []
         for library in libraries:
             # Create command with output folder
-            cmd = [
-                sys.executable,
-                'scripts/device/drum_rack/main.py',
-                str(input_path),
+            cmd = base_cmd + [
                 str(library),
                 '--output-folder',
                 str(output_dir / library.name)
             ]
-            process_library(cmd)
+            cmds.append(cmd)
+        
+        # Each library is an independent generator process, but they all write
+        # into the one Output tree, so they run one at a time unless --workers
+        # asks for more. Only this thread prints headers, as each library finishes;
+        # the generators' own lines carry the library name as a prefix.
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(process_library, cmd): Path(cmd[3]).name for cmd in cmds}
+            for future in as_completed(futures):
+                print(f"\n{'='*80}")
+                print(f"Finished library: {futures[future]}")
+                print(f"{'='*80}\n")
+                warning = future.result()
+                if warning:
+                    print(warning)
         
         print(f"\nCompleted processing {len(libraries)} libraries!")
         print(f"All drum racks can be found in: {output_dir.absolute()}")
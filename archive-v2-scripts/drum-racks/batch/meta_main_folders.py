@@ -1,56 +1,87 @@
 #!/usr/bin/env python3
 import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import subprocess
 import sys
-from typing import List
+from typing import List, Optional, Tuple
+
+# Add the scripts root to the path for the shared utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.process_runner import run_streamed
+
+def _scan_folder(path: str) -> Tuple[List[str], bool]:
+    """List a folder's subfolders and whether it holds wav files, with one scandir"""
+    subfolders = []
+    has_wav = False
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                subfolders.append(entry.path)
+            elif entry.name.endswith('.wav'):
+                has_wav = True
+    return subfolders, has_wav
 
 def find_sample_folders(base_path: Path) -> List[Path]:
     """Find all folders containing wav files"""
-    sample_folders = []
+    children = {}
+    has_wav = {}
+    # Real paths already queued, so a symlink cycle is scanned only once
+    visited = {os.path.realpath(base_path)}
     
-    try:
-        # Check if current folder has wav files
-        if any(base_path.glob('*.wav')):
-            sample_folders.append(base_path)
-        
-        # Recursively check subfolders
-        for folder in base_path.iterdir():
-            if folder.is_dir():
-                sample_folders.extend(find_sample_folders(folder))
-                
-    except Exception as e:
-        print(f"Error scanning directory {base_path}: {e}")
+    # Breadth-first, one level at a time: directory reads block in the OS
+    # and release the GIL, so a level's scandir calls overlap across threads
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        level = [str(base_path)]
+        while level:
+            next_level = []
+            for path, future in [(path, executor.submit(_scan_folder, path)) for path in level]:
+                try:
+                    subfolders, has_wav[path] = future.result()
+                except Exception as e:
+                    print(f"Error scanning directory {path}: {e}")
+                    continue
+                children[path] = []
+                for subfolder in subfolders:
+                    real_path = os.path.realpath(subfolder)
+                    if real_path not in visited:
+                        visited.add(real_path)
+                        children[path].append(subfolder)
+                next_level.extend(children[path])
+            level = next_level
+    
+    # Report the folders depth-first in pre-order, as the recursive walk did
+    sample_folders = []
+    stack = [str(base_path)]
+    while stack:
+        path = stack.pop()
+        if has_wav.get(path):
+            sample_folders.append(Path(path))
+        stack.extend(reversed(children.get(path, [])))
     
     return sample_folders
 
-def process_folder(cmd: List[str]) -> None:
-    """Process a single folder using main_generic.py"""
-    folder_path = Path(cmd[2])
-    print(f"\n{'='*80}")
-    print(f"Processing folder: {folder_path}")
-    print(f"{'='*80}\n")
+def process_folder(cmd: List[str]) -> Optional[str]:
+    """Process a single folder using main_generic.py; returns a warning if it did not succeed"""
+    folder_path = Path(cmd[3])  # Folder path is the 4th argument
     
     try:
-        # Run main_generic.py for this folder
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Print output
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print("Errors:", result.stderr, file=sys.stderr)
+        # Run main_generic.py for this folder, forwarding its output as it is produced
+        returncode, _ = run_streamed(cmd, prefix=f"[{folder_path.name}] ")
             
-        if result.returncode != 0:
-            print(f"Warning: Processing {folder_path} failed with code {result.returncode}")
+        if returncode != 0:
+            return f"Warning: Processing {folder_path} failed with code {returncode}"
             
     except Exception as e:
-        print(f"Error processing {folder_path}: {e}")
+        return f"Error processing {folder_path}: {e}"
+    return None
 
 def main():
     parser = argparse.ArgumentParser(description='Process multiple folders into drum racks')
     parser.add_argument('input_file', type=str, help='Input template .adg file path')
     parser.add_argument('base_folder', type=str, help='Path to base folder containing samples')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of folders processed concurrently (default: 1)')
     
     try:
         args = parser.parse_args()
@@ -82,22 +113,36 @@ def main():
             print(f"- {folder.relative_to(base_path)} ({wav_count} wav files)")
         print()
         
-        # Process each folder
+        # Build the command for each folder
+        # The interpreter, generator and validated input are the same for every command
+        base_cmd = [sys.executable, 'drum-racks/creation/main_simple_folder.py', str(input_path.resolve())]
+        cmds = []
         for folder in sample_folders:
             # Create relative path structure in output directory
             relative_path = folder.relative_to(base_path)
             output_folder = output_dir / relative_path
             
             # Create command
-            cmd = [
-                sys.executable,
-                'drum-racks/creation/main_simple_folder.py',
-                str(input_path),
+            cmd = base_cmd + [
                 str(folder),
                 '--output-folder',
                 str(output_folder)
             ]
-            process_folder(cmd)
+            cmds.append(cmd)
+        
+        # Each folder is an independent generator process, but they all write
+        # into the one Output tree, so they run one at a time unless --workers
+        # asks for more. Only this thread prints headers, as each folder finishes;
+        # the generators' own lines carry the folder name as a prefix.
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(process_folder, cmd): Path(cmd[3]) for cmd in cmds}
+            for future in as_completed(futures):
+                print(f"\n{'='*80}")
+                print(f"Finished folder: {futures[future]}")
+                print(f"{'='*80}\n")
+                warning = future.result()
+                if warning:
+                    print(warning)
         
         print(f"\nCompleted processing {len(sample_folders)} folders!")
         print(f"All drum racks can be found in: {output_dir.absolute()}")
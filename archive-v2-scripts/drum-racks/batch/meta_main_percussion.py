@@ -1,56 +1,57 @@
 #!/usr/bin/env python3
 import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import subprocess
 import sys
-from typing import List
+from typing import List, Optional, Tuple
 
-def find_library_folders(expansions_path: Path) -> List[Path]:
-    """Find all library folders in the expansions directory that have percussion samples"""
+# Add the scripts root to the path for the shared utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.process_runner import run_streamed
+
+def find_library_folders(expansions_path: Path) -> List[Tuple[Path, int]]:
+    """Find all library folders in the expansions directory that have percussion samples
+
+    Returns (library, percussion sample count) pairs, counted in the same
+    directory scan that checks for samples.
+    """
     libraries = []
     try:
         for folder in expansions_path.iterdir():
             perc_path = folder / 'Samples' / 'Drums' / 'Percussion'
-            if folder.is_dir() and perc_path.exists() and any(perc_path.glob('*.wav')):
-                libraries.append(folder)
+            if folder.is_dir() and perc_path.is_dir():
+                with os.scandir(perc_path) as entries:
+                    perc_count = sum(1 for entry in entries if entry.name.endswith('.wav'))
+                if perc_count:
+                    libraries.append((folder, perc_count))
     except Exception as e:
         print(f"Error scanning expansions directory: {e}")
     
     return sorted(libraries)
 
-def get_percussion_count(library_path: Path) -> int:
-    """Get the number of percussion samples in a library"""
-    perc_path = library_path / 'Samples' / 'Drums' / 'Percussion'
-    return len(list(perc_path.glob('*.wav')))
-
-def process_library(cmd: List[str]) -> None:
-    """Process a single library using main.py"""
+def process_library(cmd: List[str]) -> Optional[str]:
+    """Process a single library using main.py; returns a warning if it did not succeed"""
     library_name = Path(cmd[3]).name  # Library path is now 4th argument
-    print(f"\n{'='*80}")
-    print(f"Processing library: {library_name}")
-    print(f"{'='*80}\n")
     
     try:
-        # Run main.py for this library
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Print output
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print("Errors:", result.stderr, file=sys.stderr)
+        # Run main.py for this library, forwarding its output as it is produced
+        returncode, _ = run_streamed(cmd, prefix=f"[{library_name}] ")
             
-        if result.returncode != 0:
-            print(f"Warning: Processing {library_name} failed with code {result.returncode}")
+        if returncode != 0:
+            return f"Warning: Processing {library_name} failed with code {returncode}"
             
     except Exception as e:
-        print(f"Error processing {library_name}: {e}")
+        return f"Error processing {library_name}: {e}"
+    return None
 
 def main():
     parser = argparse.ArgumentParser(description='Create percussion-only drum racks from expansion libraries')
     parser.add_argument('input_file', type=str, help='Input template .adg file path')
     parser.add_argument('expansions_folder', type=str, 
                        help='Path to Native Instruments Expansions folder')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of libraries processed concurrently (default: 1)')
     
     try:
         args = parser.parse_args()
@@ -74,23 +75,36 @@ def main():
             return
         
         print(f"Found {len(libraries)} libraries with percussion samples:")
-        for lib in libraries:
-            perc_count = get_percussion_count(lib)
+        for lib, perc_count in libraries:
             print(f"- {lib.name} ({perc_count} percussion samples)")
         print()
         
-        # Process each library
-        for library in libraries:
+        # Build the command for each library
+        # The interpreter, generator and validated input are the same for every command
+        base_cmd = [sys.executable, 'scripts/device-creation/python/device/drum_rack/main_percussion.py', str(input_path.resolve())]
+        cmds = []
+        for library, _ in libraries:
             # Create command with output folder and percussion-only flag
-            cmd = [
-                sys.executable,
-                'scripts/device-creation/python/device/drum_rack/main_percussion.py',
-                str(input_path),
+            cmd = base_cmd + [
                 str(library),
                 '--output-folder',
                 str(output_dir / library.name)
             ]
-            process_library(cmd)
+            cmds.append(cmd)
+        
+        # Each library is an independent generator process, but they all write
+        # into the one Output tree, so they run one at a time unless --workers
+        # asks for more. Only this thread prints headers, as each library finishes;
+        # the generators' own lines carry the library name as a prefix.
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(process_library, cmd): Path(cmd[3]).name for cmd in cmds}
+            for future in as_completed(futures):
+                print(f"\n{'='*80}")
+                print(f"Finished library: {futures[future]}")
+                print(f"{'='*80}\n")
+                warning = future.result()
+                if warning:
+                    print(warning)
         
         print(f"\nCompleted processing {len(libraries)} libraries!")
         print(f"All percussion racks can be found in: {output_dir.absolute()}")
@@ -29,7 +29,7 @@ from typing import Dict, List, Tuple, Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.decoder import decode_adg
+from utils.decoder import decode_adg, decode_template_adg
 from utils.encoder import encode_adg
 
 
@@ -40,7 +40,7 @@ def extract_cc_mappings(template_path: Path) -> Dict[str, int]:
     Returns:
         Dict mapping parameter names to CC numbers
     """
-    xml = decode_adg(template_path)
+    xml = decode_template_adg(template_path)
     root = ET.fromstring(xml)
 
     mappings = {}
@@ -69,7 +69,7 @@ def extract_macro_values(template_path: Path) -> List[float]:
     Returns:
         List of 16 macro values
     """
-    xml = decode_adg(template_path)
+    xml = decode_template_adg(template_path)
     root = ET.fromstring(xml)
 
     # Find first DrumGroupDevice
@@ -105,7 +105,7 @@ def extract_effect_on_thresholds(template_path: Path) -> Tuple[int, int]:
     Returns:
         (min, max) tuple
     """
-    xml = decode_adg(template_path)
+    xml = decode_template_adg(template_path)
     root = ET.fromstring(xml)
 
     # Find first DrumCell with Effect_On
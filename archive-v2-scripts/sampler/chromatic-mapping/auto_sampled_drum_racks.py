@@ -9,7 +9,7 @@ import re
 # Add the python directory to the Python path for imports
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from utils.decoder import decode_adg
+from utils.decoder import decode_template_adg
 from utils.encoder import encode_adg
 
 def note_name_to_midi(note_name: str) -> int:
@@ -265,7 +265,7 @@ def main():
                 output_path = output_folder / f"{safe_name}.adg"
                 
                 # Transform template
-                xml_content = decode_adg(template_path)
+                xml_content = decode_template_adg(template_path)
                 transformed_xml = transform_drum_rack_xml(xml_content, ordered_samples)
                 encode_adg(transformed_xml, output_path)
                 
@@ -13,7 +13,7 @@ import shutil
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from utils.decoder import decode_adg
+from utils.decoder import decode_adg, decode_adg_bytes, find_in_adg
 from utils.encoder import encode_adg
 
 # Test configuration
@@ -69,8 +69,12 @@ print("Test 1: Verify Sample Library")
 try:
     if SAMPLE_LIBRARY.exists():
         sample_types = list(SAMPLE_LIBRARY.iterdir())
-        sample_count = sum(1 for st in sample_types if st.is_dir()
-                          for _ in st.glob("*.wav"))
+        sample_count = 0
+        for st in sample_types:
+            if not st.is_dir():
+                continue
+            with os.scandir(st) as entries:
+                sample_count += sum(1 for e in entries if e.name.endswith(".wav"))
         results.add_pass(
             "Sample Library Accessible",
             f"Found {len(sample_types)} sample types, ~{sample_count} samples"
@@ -139,7 +143,7 @@ try:
     template = TEMPLATES_DIR / "drum-racks/Anima Ascent Acid + Amazon.adg"
 
     # Decode
-    xml_content = decode_adg(template)
+    xml_content = decode_adg_bytes(template)
     results.add_pass("Decode Template", f"{len(xml_content):,} bytes XML")
 
     # Create temp file and re-encode
@@ -153,8 +157,8 @@ try:
         results.add_pass("Re-encode to ADG", f"{size:,} bytes")
 
         # Decode again to verify
-        xml_content2 = decode_adg(tmp_path)
-        if len(xml_content) == len(xml_content2):
+        xml_content2 = decode_adg_bytes(tmp_path)
+        if xml_content == xml_content2:
             results.add_pass("Round-trip Integrity", "XML matches original")
         else:
             results.add_fail(
@@ -181,14 +185,18 @@ except Exception as e:
 # Test 6: Verify sample files are readable
 print("\nTest 6: Sample File Access")
 try:
-    kick_samples = list((SAMPLE_LIBRARY / "Kick").glob("*.wav"))[:5]
+    # DirEntry objects carry the directory listing's stat info, so there is
+    # no separate exists()/stat() round-trip per sample
+    with os.scandir(SAMPLE_LIBRARY / "Kick") as entries:
+        kick_samples = [e for e in entries if e.name.endswith(".wav")][:5]
 
     if kick_samples:
         for sample in kick_samples:
-            if sample.exists() and sample.stat().st_size > 0:
+            size = sample.stat().st_size
+            if size > 0:
                 results.add_pass(
                     f"Sample Readable: {sample.name}",
-                    f"{sample.stat().st_size:,} bytes"
+                    f"{size:,} bytes"
                 )
             else:
                 results.add_fail(f"Sample Readable: {sample.name}", "Invalid file")
@@ -202,7 +210,6 @@ except Exception as e:
 print("\nTest 7: XML Transformer Test")
 try:
     template = TEMPLATES_DIR / "drum-racks/Drum Rack Template.adg"
-    xml_content = decode_adg(template)
 
     # Check for key XML elements
     required_elements = [
@@ -211,9 +218,11 @@ try:
         'MultiSampler',
         'FileRef'
     ]
+    # Streams the inflate and stops once every element has been seen
+    found_elements = find_in_adg(template, required_elements)
 
     for element in required_elements:
-        if element in xml_content:
+        if element in found_elements:
             results.add_pass(
                 f"XML Contains: {element}",
                 "Element found in template"
@@ -0,0 +1,44 @@
+# adg_io.py
+from pathlib import Path
+from typing import Union
+
+from utils.decoder import decode_adg, decode_adg_bytes
+from utils.encoder import encode_adg
+
+def load_adg(adg_path: Path) -> str:
+    """
+    Load an .adg file as an XML string
+
+    Args:
+        adg_path (Path): Path to the .adg file
+
+    Returns:
+        str: Decoded XML content
+    """
+    return decode_adg(Path(adg_path))
+
+def load_adg_bytes(adg_path: Path) -> bytes:
+    """
+    Load an .adg file as raw UTF-8 XML bytes, skipping the str decode
+
+    Args:
+        adg_path (Path): Path to the .adg file
+
+    Returns:
+        bytes: Decompressed XML content
+    """
+    return decode_adg_bytes(Path(adg_path))
+
+def save_adg(xml_content: Union[str, bytes], adg_path: Path) -> None:
+    """
+    Save an XML string as an .adg file
+
+    Uses compresslevel=1: Ableton only needs a valid gzip stream, and the fast
+    deflate setting is several times quicker than the default. The gzip codec
+    is whichever encode_adg picked.
+
+    Args:
+        xml_content (str | bytes): XML content to encode
+        adg_path (Path): Path where the .adg file should be saved
+    """
+    encode_adg(xml_content, adg_path, compresslevel=1)
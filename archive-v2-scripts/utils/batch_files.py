@@ -0,0 +1,25 @@
+# batch_files.py
+import os
+from pathlib import Path
+from typing import Iterator
+
+# Files between progress lines when a batch script is not running --verbose
+PROGRESS_INTERVAL = 50
+
+def iter_adg_files(root: Path) -> Iterator[str]:
+    """
+    Yield the path of every .adg file under root as a plain string
+
+    os.walk lists each directory with one scandir; unlike rglob it builds no
+    Path objects for the entries it skips.
+
+    Args:
+        root (Path): Folder to search recursively
+
+    Returns:
+        Iterator[str]: Paths of the .adg files, joined onto root
+    """
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith('.adg'):
+                yield os.path.join(dirpath, filename)
@@ -1,15 +1,17 @@
 #!/usr/bin/env python3
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 import sys
-import os
 
 # Add the python directory to the Python path for imports
 sys.path.append(str(Path(__file__).parent.parent))
+from utils.batch_files import iter_adg_files
 from utils.decoder import decode_adg
 from utils.encoder import encode_adg
-from utils.scroll_position import transform_scroll_position
+from utils.scroll_position import find_scroll_position, transform_scroll_position
 
 def find_adg_files(folder_path: Path) -> List[Path]:
     """
@@ -21,50 +23,51 @@ def find_adg_files(folder_path: Path) -> List[Path]:
     Returns:
         List[Path]: List of paths to .adg files
     """
-    adg_files = []
-    try:
-        for path in folder_path.rglob("*.adg"):
-            adg_files.append(path)
-    except Exception as e:
-        print(f"Error scanning folder: {e}")
-    
-    return sorted(adg_files)
+    return [Path(path) for path in sorted(iter_adg_files(folder_path))]
 
-def process_adg_file(file_path: Path, scroll_position: int) -> bool:
+def process_adg_file(file_path: Path, scroll_position: int) -> Tuple[str, str]:
     """
     Process a single ADG file by modifying its scroll position
+
+    Files that already have the requested scroll position are left untouched,
+    skipping the re-encode. Runs in a worker process, so nothing is printed
+    here; the caller prints the returned message in file order.
     
     Args:
         file_path (Path): Path to the ADG file
         scroll_position (int): New scroll position value
         
     Returns:
-        bool: True if successful, False otherwise
+        Tuple[str, str]: "updated", "unchanged", "not_found", or "failed",
+            and the lines to print for the file
     """
+    header = f"\nProcessing: {file_path}"
     try:
-        print(f"\nProcessing: {file_path}")
-        
         # Read and decode the ADG file
         xml_content = decode_adg(file_path)
         
         # Transform the content
         modified_xml = transform_scroll_position(xml_content, scroll_position)
+        if modified_xml is None:
+            if find_scroll_position(xml_content) is None:
+                return "not_found", f"{header}\nNo PadScrollPosition element, left as is: {file_path}"
+            return "unchanged", f"{header}\nNo changes needed: {file_path}"
         
         # Save directly back to the original file
         encode_adg(modified_xml, file_path)
         
-        print(f"Successfully updated: {file_path}")
-        return True
+        return "updated", f"{header}\nSet scroll position to {scroll_position}\nSuccessfully updated: {file_path}"
         
     except Exception as e:
-        print(f"Error processing {file_path}: {e}")
-        return False
+        return "failed", f"{header}\nError processing {file_path}: {e}"
 
 def main():
     parser = argparse.ArgumentParser(description='Recursively process all ADG files in a folder')
     parser.add_argument('folder', type=str, help='Folder to search for ADG files')
     parser.add_argument('--scroll', type=int, default=0,
                        help='Scroll position value (0-31, default: 0)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Number of worker processes (default: CPU count)')
     
     try:
         args = parser.parse_args()
@@ -86,14 +89,23 @@ def main():
         print(f"Found {len(adg_files)} ADG files to process")
         print(f"Setting scroll position to: {args.scroll}")
         
-        # Process each file
-        success_count = 0
-        for file_path in adg_files:
-            if process_adg_file(file_path, args.scroll):
-                success_count += 1
+        # Process files in parallel; each decode/transform/encode is independent
+        worker = functools.partial(process_adg_file, scroll_position=args.scroll)
+        results = []
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            # map yields in submission order, so the log reads file by file
+            for status, message in executor.map(worker, adg_files, chunksize=4):
+                print(message)
+                results.append(status)
+        updated_count = results.count("updated")
+        unchanged_count = results.count("unchanged")
+        not_found_count = results.count("not_found")
+        success_count = updated_count + unchanged_count + not_found_count
         
         print(f"\nProcessing complete!")
         print(f"Successfully processed {success_count} out of {len(adg_files)} files")
+        print(f"  Updated: {updated_count}, unchanged: {unchanged_count}, "
+              f"no PadScrollPosition: {not_found_count}")
         
         return 0 if success_count == len(adg_files) else 1
         
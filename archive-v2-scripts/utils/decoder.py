@@ -1,6 +1,35 @@
 # decoder.py
-import gzip
+import functools
+try:
+    # zlib-ng is a SIMD-accelerated drop-in for the zlib module
+    from zlib_ng import zlib_ng as zlib
+except ImportError:
+    try:
+        # ISA-L's vectorized inflate is about 2x stdlib zlib
+        from isal import isal_zlib as zlib
+    except ImportError:
+        import zlib
 from pathlib import Path
+from typing import Iterable, Set
+
+def decode_adg_bytes(adg_path: Path) -> bytes:
+    """
+    Decode an Ableton .adg file to raw UTF-8 XML bytes
+
+    Every tag the scripts edit is ASCII, so byte-level edits are safe and skip
+    the UTF-8 decode/encode round-trip.
+
+    Args:
+        adg_path (Path): Path to the .adg file
+
+    Returns:
+        bytes: Decoded XML content
+    """
+    try:
+        # wbits=31 selects the gzip container; inflates in a single C call
+        return zlib.decompress(Path(adg_path).read_bytes(), 31)
+    except Exception as e:
+        raise Exception(f"Error decoding ADG file: {e}")
 
 def decode_adg(adg_path: Path) -> str:
     """
@@ -12,9 +41,64 @@ def decode_adg(adg_path: Path) -> str:
     Returns:
         str: Decoded XML content
     """
+    return decode_adg_bytes(adg_path).decode('utf-8')
+
+@functools.lru_cache(maxsize=8)
+def _decode_template(path_str: str, mtime_ns: int, size: int) -> str:
+    """Decode a template; keyed on (path, mtime_ns, size) so edits invalidate"""
+    return decode_adg(Path(path_str))
+
+def decode_template_adg(template_path: Path) -> str:
+    """
+    Decode a template .adg file to XML string, reusing earlier decodes
+
+    For templates that a script loads over and over; every other file should
+    go through decode_adg, which keeps nothing in memory.
+
+    Args:
+        template_path (Path): Path to the template .adg file
+
+    Returns:
+        str: Decoded XML content
+    """
+    try:
+        stat = Path(template_path).stat()
+    except Exception as e:
+        raise Exception(f"Error decoding ADG file: {e}")
+    return _decode_template(str(template_path), stat.st_mtime_ns, stat.st_size)
+
+def find_in_adg(adg_path: Path, terms: Iterable[str], chunk_size: int = 65536) -> Set[str]:
+    """
+    Find which ASCII terms occur in an .adg file's XML without inflating all of it
+
+    The file is inflated chunk by chunk and scanning stops as soon as every
+    term has been seen, which for header-level tags is usually within the
+    first few KB.
+
+    Args:
+        adg_path (Path): Path to the .adg file
+        terms (Iterable[str]): Substrings to look for
+        chunk_size (int): Compressed bytes read per step
+
+    Returns:
+        Set[str]: The terms that were found
+    """
+    remaining = {term.encode('utf-8'): term for term in terms}
+    found = set()
+    # Carry the tail of the previous chunk so terms split across chunks match
+    overlap = max((len(term) for term in remaining), default=1) - 1
+    inflater = zlib.decompressobj(31)
+    tail = b''
     try:
-        with gzip.open(adg_path, 'rb') as f:
-            xml_content = f.read().decode('utf-8')
-        return xml_content
+        with open(adg_path, 'rb') as f:
+            while remaining:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                window = tail + inflater.decompress(chunk)
+                for term in [t for t in remaining if t in window]:
+                    found.add(remaining.pop(term))
+                tail = window[-overlap:] if overlap else b''
     except Exception as e:
-        raise Exception(f"Error decoding ADG file: {e}")
\ No newline at end of file
+        raise Exception(f"Error decoding ADG file: {e}")
+    return found
@@ -1,25 +1,76 @@
 # encoder.py
 import gzip
+try:
+    # zlib-ng ships a SIMD-accelerated deflate with the same gzip API and levels
+    from zlib_ng import gzip_ng
+except ImportError:
+    gzip_ng = None
+try:
+    # ISA-L's igzip is faster again, but only has levels 0-3 and even its
+    # best output is ~25% larger than level 6, so it only serves callers
+    # that ask for a fast level
+    from isal import igzip, isal_zlib
+except ImportError:
+    igzip = None
+import io
 from pathlib import Path
+from typing import Optional, Union
 
-def encode_adg(xml_content: str, output_path: Path) -> None:
+# Default deflate level: about 3x faster than the default 9 on rack XML, for
+# files under 10% larger
+_COMPRESSLEVEL = 6
+
+def _gzip_for(compresslevel: int):
+    """Pick the fastest installed gzip module that supports compresslevel"""
+    if gzip_ng is not None:
+        return gzip_ng
+    if igzip is not None and compresslevel <= isal_zlib.ISAL_BEST_COMPRESSION:
+        return igzip
+    return gzip
+
+def encode_adg(xml_content: Union[str, bytes], output_path: Path, compresslevel: Optional[int] = None) -> None:
     """
     Encode XML content to an Ableton .adg file
 
     Matches Ableton's gzip format:
     - No timestamp (mtime=0)
     - No filename in header (filename='')
-    - Deflate compression
+    - Deflate compression (level 6 unless compresslevel says otherwise)
 
     Args:
-        xml_content (str): XML content to encode
+        xml_content (str | bytes): XML content to encode (bytes are written as-is)
         output_path (Path): Path where the .adg file should be saved
+        compresslevel (int): Deflate level to use instead of the default above
     """
+    if compresslevel is None:
+        compresslevel = _COMPRESSLEVEL
     try:
         # Use GzipFile with explicit parameters to match Ableton's format
         # filename='' prevents FNAME flag from being set
         with open(output_path, 'wb') as f_out:
-            with gzip.GzipFile(filename='', fileobj=f_out, mode='wb', mtime=0) as gz:
-                gz.write(xml_content.encode('utf-8'))
+            with _gzip_for(compresslevel).GzipFile(filename='', fileobj=f_out, mode='wb', compresslevel=compresslevel, mtime=0) as gz:
+                if isinstance(xml_content, str):
+                    xml_content = xml_content.encode('utf-8')
+                gz.write(xml_content)
+    except Exception as e:
+        raise Exception(f"Error encoding ADG file: {e}")
+
+def encode_adg_tree(tree, output_path: Path) -> None:
+    """
+    Stream an XML tree straight into an Ableton .adg file
+
+    Serializes through ElementTree.write, so the document is never built as
+    one string. Works with both xml.etree and lxml trees.
+
+    Args:
+        tree (ElementTree): Tree to write (with its XML declaration)
+        output_path (Path): Path where the .adg file should be saved
+    """
+    try:
+        with open(output_path, 'wb') as f_out:
+            with _gzip_for(_COMPRESSLEVEL).GzipFile(filename='', fileobj=f_out, mode='wb', compresslevel=_COMPRESSLEVEL, mtime=0) as gz:
+                # Coalesce the serializer's many small writes before they reach deflate
+                with io.BufferedWriter(gz, buffer_size=1 << 17) as buffered:
+                    tree.write(buffered, encoding='UTF-8', xml_declaration=True)
     except Exception as e:
-        raise Exception(f"Error encoding ADG file: {e}")
\ No newline at end of file
+        raise Exception(f"Error encoding ADG file: {e}")
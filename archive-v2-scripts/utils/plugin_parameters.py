@@ -0,0 +1,34 @@
+# plugin_parameters.py
+import functools
+
+# One PluginParameterSettings entry: Id, Index, VisualIndex, ParameterId, LomId
+PARAM_TEMPLATE = (
+    b'\t\t\t<PluginParameterSettings Id="%d">\n'
+    b'\t\t\t\t<Index Value="%d" />\n'
+    b'\t\t\t\t<VisualIndex Value="%d" />\n'
+    b'\t\t\t\t<ParameterId Value="%d" />\n'
+    b'\t\t\t\t<Type Value="PluginFloatParameter" />\n'
+    b'\t\t\t\t<MacroControlIndex Value="-1" />\n'
+    b'\t\t\t\t<MidiControllerRange />\n'
+    b'\t\t\t\t<LomId Value="%d" />\n'
+    b'\t\t\t</PluginParameterSettings>'
+)
+
+@functools.lru_cache(maxsize=None)
+def build_param_section(num_params: int, start_lom_id: int) -> bytes:
+    """
+    Build the <ParameterSettings> block for plugin parameters 101 to 100 + num_params
+
+    Cached: the converters ask for the same few blocks on every file.
+
+    Args:
+        num_params (int): Number of PluginParameterSettings entries
+        start_lom_id (int): LomId of the first entry
+
+    Returns:
+        bytes: The complete ParameterSettings element
+    """
+    full_param_settings = b'\n'.join(
+        PARAM_TEMPLATE % (i, i * 2, i, 101 + i, start_lom_id + i) for i in range(num_params)
+    )
+    return b'<ParameterSettings>\n' + full_param_settings + b'\n\t\t\t\t\t</ParameterSettings>'
@@ -0,0 +1,58 @@
+# process_runner.py
+import os
+import subprocess
+import sys
+import threading
+from typing import List, Optional, Tuple
+
+def _forward_lines(stream, out, prefix: str, keep: Optional[list]) -> None:
+    """Copy a child's output stream to out line by line as it arrives"""
+    for line in stream:
+        out.write(prefix + line)
+        out.flush()
+        if keep is not None:
+            keep.append(line)
+    stream.close()
+
+def run_streamed(cmd: List[str], prefix: str = '', timeout: Optional[float] = None) -> Tuple[int, str]:
+    """
+    Run a command, forwarding its stdout and stderr as they are produced
+
+    Unlike subprocess.run(capture_output=True), nothing is buffered until the
+    child exits: each pipe is drained by its own thread, so progress shows in
+    real time and a child that fills one pipe cannot deadlock on the other.
+    Python children are run unbuffered so their lines arrive promptly.
+
+    Args:
+        cmd (List[str]): Command to run
+        prefix (str): Text put in front of every forwarded line
+        timeout (float): Seconds to wait before killing the child
+
+    Returns:
+        Tuple[int, str]: Return code and the child's stderr text
+
+    Raises:
+        subprocess.TimeoutExpired: If the child was killed after timeout seconds
+    """
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, bufsize=1, env=env)
+    stderr_lines = []
+    readers = [
+        threading.Thread(target=_forward_lines, args=(proc.stdout, sys.stdout, prefix, None), daemon=True),
+        threading.Thread(target=_forward_lines, args=(proc.stderr, sys.stderr, prefix, stderr_lines), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        for reader in readers:
+            reader.join()
+
+    return returncode, ''.join(stderr_lines)
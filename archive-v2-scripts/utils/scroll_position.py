@@ -1,16 +1,33 @@
 #!/usr/bin/env python3
 import argparse
 import os
+import re
 import sys
-import xml.etree.ElementTree as ET
 from pathlib import Path
+from typing import Optional
 
 # Add the python directory to the Python path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.decoder import decode_adg
 from utils.encoder import encode_adg
 
-def transform_scroll_position(xml_content: str, scroll_position: int) -> str:
+# The first PadScrollPosition in document order, i.e. the outermost drum rack's
+_PAD_SCROLL_POSITION_RE = re.compile(r'<PadScrollPosition Value="([^"]*)"')
+
+def find_scroll_position(xml_content: str) -> Optional[str]:
+    """
+    Read the outermost drum rack's pad scroll position
+    
+    Args:
+        xml_content (str): XML content to search
+        
+    Returns:
+        str | None: The current Value, or None if there is no PadScrollPosition element
+    """
+    match = _PAD_SCROLL_POSITION_RE.search(xml_content)
+    return match.group(1) if match is not None else None
+
+def transform_scroll_position(xml_content: str, scroll_position: int) -> Optional[str]:
     """
     Transform the XML content by modifying the pad scroll position
     
@@ -19,22 +36,18 @@ def transform_scroll_position(xml_content: str, scroll_position: int) -> str:
         scroll_position (int): New scroll position value
         
     Returns:
-        str: Transformed XML content
+        str | None: Transformed XML content, or None if nothing was changed:
+            either the position is already set or there is no PadScrollPosition
+            element (find_scroll_position tells the two apart)
     """
     try:
-        # Parse the XML
-        root = ET.fromstring(xml_content)
-        
-        # Find and modify the PadScrollPosition
-        pad_scroll_pos = root.find(".//PadScrollPosition")
-        if pad_scroll_pos is not None:
-            pad_scroll_pos.set('Value', str(scroll_position))
-            print(f"Set scroll position to {scroll_position}")
-        else:
-            print("Warning: Could not find PadScrollPosition element")
+        # Patch the attribute in place; parsing and re-serializing the whole
+        # document would cost far more than the single value being changed
+        match = _PAD_SCROLL_POSITION_RE.search(xml_content)
+        if match is None or match.group(1) == str(scroll_position):
+            return None
         
-        # Convert back to string with the XML declaration
-        return ET.tostring(root, encoding='unicode', xml_declaration=True)
+        return f"{xml_content[:match.start(1)]}{scroll_position}{xml_content[match.end(1):]}"
     
     except Exception as e:
         raise Exception(f"Error transforming XML: {e}")
@@ -45,6 +58,14 @@ def modify_scroll_position(input_file, output_file, scroll_position):
     
     # Transform the content
     transformed_xml = transform_scroll_position(xml_content, scroll_position)
+    if transformed_xml is not None:
+        print(f"Set scroll position to {scroll_position}")
+    else:
+        if find_scroll_position(xml_content) is None:
+            print("Warning: Could not find PadScrollPosition element")
+        else:
+            print(f"Scroll position already {scroll_position}")
+        transformed_xml = xml_content
     
     # Encode and save the output file
     encode_adg(transformed_xml, Path(output_file))